@@ -0,0 +1,130 @@
+import hashlib
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from backend.fileio import FileLock, new_file_mode
+
+ANSWER_LOG = 'data/answers.bin'
+
+# File layout: a header (magic, format version, record size) followed by fixed-width records, one
+# per answered or timed-out question, appended as quizzes are taken by every app and server:
+#   quiz      u64  random id shared by the answers of one quiz
+#   question  u64  question_id(): 64-bit hash of the category and question text, stable across bank edits
+#   user      u32  crc32 of the username
+#   time      u32  Unix time of the answer
+#   seconds   f32  time taken to answer
+#   choice    i8   picked option in the bank's order, -1 when time ran out
+#   correct   u8   1 or 0
+#   options   u8   number of options of the question
+#   (1 padding byte)
+# Records are written whole with O_APPEND, so concurrent writers never interleave inside a record;
+# a record cut short by a crash is ignored by the readers.
+# Version 1 keyed questions by a 32-bit crc32, which collides for banks of ~10^5 questions and more.
+MAGIC = b"MCQA"
+VERSION = 2
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<QQIIfbBBx")
+
+# The same layout for NumPy readers (see backend.item_analysis)
+RECORD_FIELDS = [
+    ("quiz", "<u8"), ("question", "<u8"), ("user", "<u4"), ("time", "<u4"), ("seconds", "<f4"),
+    ("choice", "i1"), ("correct", "u1"), ("options", "u1"), ("pad", "u1"),
+]
+
+def question_id(category, text):
+    return int.from_bytes(hashlib.blake2b(f"{category}\0{text}".encode(), digest_size=8).digest(), "little")
+
+def user_id(username):
+    return zlib.crc32(username.encode())
+
+class AnswerLog:
+    """
+    Appends answer records to the log file, which is created (with its header) on first use.
+    The log is only telemetry: the first write error is reported and turns it off for the process.
+    """
+    def __init__(self, path=ANSWER_LOG):
+        self.path = path
+        self.fd = None
+        self.failed = False
+
+    def _open(self):
+        if not self._is_current():
+            with FileLock(self.path + ".lock"):
+                if not self._is_current():
+                    self._move_old_log()
+                    self._create()
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+
+    def _is_current(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read(HEADER.size) == HEADER.pack(MAGIC, VERSION, RECORD.size)
+        except FileNotFoundError:
+            return False
+
+    def _move_old_log(self):
+        # A log written in another format is kept next to the new one (e.g. answers.bin.v1)
+        try:
+            with open(self.path, 'rb') as f:
+                magic, version, _ = HEADER.unpack(f.read(HEADER.size).ljust(HEADER.size, b"\0"))
+        except FileNotFoundError:
+            return
+        os.replace(self.path, f"{self.path}.v{version}" if magic == MAGIC else self.path + ".old")
+
+    def _create(self):
+        # The file appears with its header already written (linking fails if another process
+        # created it first), so no record can be appended before the header
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        try:
+            os.write(fd, HEADER.pack(MAGIC, VERSION, RECORD.size))
+            os.close(fd)
+            # Writable by the other accounts sharing the data folder, as far as the umask allows
+            os.chmod(tmp_path, new_file_mode())
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+    def write(self, records):
+        """Append packed records (bytes, a multiple of RECORD.size) in one write."""
+        if self.fd is None:
+            self._open()
+        os.write(self.fd, records)
+
+    def recorder(self, username):
+        """
+        Return a QuizSession.on_answer hook logging the answers of one quiz by the given user.
+        """
+        quiz = int.from_bytes(os.urandom(8), "little")
+        user = user_id(username or "")
+
+        def on_answer(question, choice, correct, seconds):
+            if self.failed:
+                return
+            try:
+                self.write(RECORD.pack(
+                    quiz, question_id(question.category, question.text), user, int(time.time()),
+                    seconds, choice, correct, len(question.options)
+                ))
+            except OSError as e:
+                # A full disk or a log owned by another account must not stop the quiz
+                self.failed = True
+                print(f"Error: answer log {self.path} disabled:", e)
+        return on_answer
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+_logs = {}
+
+def answer_log(path=ANSWER_LOG):
+    """The shared AnswerLog of a path; its file is only opened by the first answer."""
+    if path not in _logs:
+        _logs[path] = AnswerLog(path)
+    return _logs[path]
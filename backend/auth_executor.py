@@ -0,0 +1,43 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+class AuthExecutor:
+    """
+    Thread pool for bcrypt hashing and verification.
+    bcrypt releases the GIL while it works, so the Tk main loop stays responsive and
+    batch jobs spread over all cores. Tasks must not touch the user store: lookups and
+    writes stay on the calling thread.
+    """
+    POLL_INTERVAL = 20  # ms between checks for a finished task from the Tk main loop
+
+    def __init__(self, max_workers=None):
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count() or 2,
+            thread_name_prefix="auth"
+        )
+
+    def submit(self, fn, *args):
+        return self.pool.submit(fn, *args)
+
+    def map(self, fn, *iterables):
+        """Run fn over the iterables in parallel, yielding results in input order."""
+        return self.pool.map(fn, *iterables)
+
+    def run(self, root, callback, fn, *args):
+        """
+        Run fn(*args) in the pool and call callback(future) on the Tk thread once it is done.
+        Completion is polled with root.after(), since Tk must only be used from its own thread.
+        """
+        future = self.pool.submit(fn, *args)
+
+        def poll():
+            if future.done():
+                callback(future)
+            else:
+                root.after(self.POLL_INTERVAL, poll)
+
+        root.after(self.POLL_INTERVAL, poll)
+        return future
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
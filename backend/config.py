@@ -0,0 +1,52 @@
+import json
+
+from backend.fileio import FileLock, atomic_write_json
+from backend.tracing import span
+
+CONFIG_FILE = 'data/config.json'
+
+DEFAULT_CONFIG = {
+    "user_store": "sqlite",
+    # bcrypt work factor for new hashes; existing hashes are upgraded on the next login
+    "bcrypt_rounds": 12,
+    # Journal store: fsync after this many appended events or seconds, compact past this many events
+    "journal_fsync_batch": 8,
+    "journal_fsync_interval": 1.0,
+    "journal_compact_threshold": 1000,
+    # Questions per quiz and optional relative weight per category name (1 when missing)
+    "quiz_size": 7,
+    "category_weights": {},
+    # Seconds to answer each question and to finish the whole quiz (0: no limit)
+    "question_time": 30,
+    "exam_time": 0,
+    # Append every answer to data/answers.bin for cli.py analyze
+    "answer_log": True,
+    # How quizzes pick their questions: "random", or "adaptive" (questions due for review and unseen
+    # ones first, from the user's mastery table); the category screen can switch it per quiz
+    "quiz_mode": "random",
+}
+
+def load_config():
+    """
+    Load the application settings from the JSON file. Missing keys (or a missing file) fall back to the defaults.
+    """
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with span(f"read {CONFIG_FILE}", "io"), open(CONFIG_FILE, 'r') as f:
+            config.update(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return config
+
+def save_config(updates):
+    """
+    Store the given settings in the JSON file, keeping the other settings already there.
+    """
+    with FileLock(CONFIG_FILE + ".lock"):
+        try:
+            with span(f"read {CONFIG_FILE}", "io"), open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            config = {}
+        config.update(updates)
+        atomic_write_json(CONFIG_FILE, config, indent=4)
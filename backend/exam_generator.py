@@ -0,0 +1,71 @@
+import json
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.question_bank import QuestionBank, open_question_bank
+from backend.question_management import sample_quizzes
+
+CHUNK_SIZE = 200  # papers generated per worker task
+
+_bank = None
+
+def _init_worker(bank_path):
+    global _bank
+    _bank = QuestionBank(bank_path)
+
+def paper_record(paper_id, quiz):
+    """
+    Return the JSON record of one exam paper: its questions in order and the answer key
+    (1-based position of the right option of each question).
+    """
+    return {
+        "paper": paper_id,
+        "questions": [
+            {"category": q.category, "question": q.text, "options": list(q.options)}
+            for q in quiz
+        ],
+        "answers": [q.correct + 1 for q in quiz]
+    }
+
+def _generate_chunk(first_id, count, categories, size, weights, seed):
+    quizzes = sample_quizzes(_bank, categories, size, n=count, weights=weights, seed=seed)
+    return "".join(
+        json.dumps(paper_record(first_id + i, quiz), ensure_ascii=False) + "\n"
+        for i, quiz in enumerate(quizzes)
+    )
+
+def generate_papers(out, count, categories=None, size=7, weights=None, seed=None, workers=None):
+    """
+    Write count randomized exam papers with their answer keys to the text stream out, one JSON
+    object per line. Papers are generated in chunks by a pool of worker processes and written in
+    order as they complete, with a bounded number of chunks in flight so memory stays flat.
+    The same seed gives the same papers whatever the number of workers.
+    Raises ValueError, before anything is written, if a category is not in the question bank.
+    """
+    bank = open_question_bank()
+    unknown = [c for c in categories or [] if c not in bank.index]
+    available = bank.categories()
+    bank.close()
+    if unknown:
+        raise ValueError(f"Unknown categories: {', '.join(unknown)} (available: {', '.join(available)})")
+    categories = categories or available
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(bank.path,)) as pool:
+        pending = deque()
+        for first_id, chunk_count, chunk_seed in _chunks(count, seed):
+            pending.append(pool.submit(_generate_chunk, first_id, chunk_count, categories, size, weights, chunk_seed))
+            if len(pending) >= 2 * workers:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+    return count
+
+def _chunks(count, seed):
+    # One seed per chunk, derived from the main seed
+    seeds = random.Random(seed)
+    for first_id in range(1, count + 1, CHUNK_SIZE):
+        chunk_seed = seeds.getrandbits(63) if seed is not None else None
+        yield first_id, min(CHUNK_SIZE, count + 1 - first_id), chunk_seed
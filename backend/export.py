@@ -0,0 +1,171 @@
+import csv
+import gzip
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.history import format_score
+from backend.user_store import open_user_store
+
+CSV_HEADER = ["Date", "Total Score", "Category", "Category Score"]
+# All-users exports start with the username and keep the scores numeric
+BULK_HEADER = ["Username", "Date", "Correct", "Total", "Category", "Category Correct", "Category Total"]
+FORMATS = ("csv", "parquet")
+PARQUET_BATCH = 10_000  # rows per Parquet row group
+
+def open_text(path, compress=False):
+    """Open a CSV file for writing, gzip-compressed when asked or when the name ends in .gz."""
+    if compress or path.endswith(".gz"):
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+def user_rows(history):
+    """Yield the CSV rows of one user's history: one row per category of each quiz."""
+    for entry in history:
+        total_score = format_score(entry["correct"], entry["total"])
+        for cat in entry["categories"]:
+            yield [entry["date"], total_score, cat["category"], format_score(cat["correct"], cat["total"])]
+
+def bulk_rows(store, usernames):
+    """Yield the all-users rows of the given users, streaming each history from the store."""
+    for username in usernames:
+        for entry in store.iter_history(username):
+            for cat in entry["categories"]:
+                yield [username, entry["date"], entry["correct"], entry["total"],
+                       cat["category"], cat["correct"], cat["total"]]
+
+def export_user_csv(users, username, path, compress=False):
+    """Write the quiz history of one user to a CSV file. Returns the number of rows written."""
+    count = 0
+    with open_text(path, compress) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for row in user_rows(users.iter_history(username)):
+            writer.writerow(row)
+            count += 1
+    return count
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ("username", pa.string()),
+        ("date", pa.string()),
+        ("correct", pa.int32()),
+        ("total", pa.int32()),
+        ("category", pa.string()),
+        ("category_correct", pa.int32()),
+        ("category_total", pa.int32()),
+    ])
+
+def _parquet_table(pa, schema, rows):
+    columns = zip(*rows)
+    return pa.Table.from_arrays([pa.array(column, field.type) for column, field in zip(columns, schema)], schema=schema)
+
+def _write_parquet(rows, path):
+    pa = _pyarrow()
+    schema = _parquet_schema(pa)
+    count = 0
+    with pa.parquet.ParquetWriter(path, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == PARQUET_BATCH:
+                writer.write_table(_parquet_table(pa, schema, batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(_parquet_table(pa, schema, batch))
+            count += len(batch)
+    return count
+
+def _write_csv(rows, path, compress, header):
+    count = 0
+    with open_text(path, compress) as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(BULK_HEADER)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def _export_shard(config, usernames, path, fmt, compress, header):
+    # Runs in a worker process, which opens its own connection to the store
+    store = open_user_store(config)
+    try:
+        rows = bulk_rows(store, usernames)
+        if fmt == "parquet":
+            return _write_parquet(rows, path)
+        return _write_csv(rows, path, compress, header)
+    finally:
+        store.close()
+
+def _shards(items, count):
+    size, extra = divmod(len(items), count)
+    start = 0
+    for i in range(count):
+        end = start + size + (i < extra)
+        yield items[start:end]
+        start = end
+
+def export_all(path, fmt="csv", compress=False, workers=1, config=None):
+    """
+    Export the quiz history of every user to a single file, one row per category of each quiz.
+    Rows are streamed from the store, so memory does not grow with the number of users. With
+    several workers, the users are split into contiguous shards written by separate processes
+    and the parts are joined in order (gzip members and Parquet row groups can be concatenated).
+    Returns the number of rows written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    if fmt == "parquet":
+        _pyarrow()  # fail before any work is done
+    compress = compress or path.endswith(".gz")  # the part files do not carry the extension
+
+    store = open_user_store(config)
+    try:
+        usernames = store.usernames()
+        if workers <= 1 or len(usernames) < 2:
+            rows = bulk_rows(store, usernames)
+            if fmt == "parquet":
+                return _write_parquet(rows, path)
+            return _write_csv(rows, path, compress, header=True)
+    finally:
+        store.close()
+
+    workers = min(workers, len(usernames))
+    parts = [f"{path}.part{i}" for i in range(workers)]
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(_export_shard, config, shard, part, fmt, compress, i == 0)
+                for i, (shard, part) in enumerate(zip(_shards(usernames, workers), parts))
+            ]
+            count = sum(future.result() for future in futures)
+        _join_parts(parts, path, fmt)
+    finally:
+        for part in parts:
+            if os.path.exists(part):
+                os.remove(part)
+    return count
+
+def _join_parts(parts, path, fmt):
+    if fmt == "parquet":
+        pa = _pyarrow()
+        with pa.parquet.ParquetWriter(path, _parquet_schema(pa)) as writer:
+            for part in parts:
+                part_file = pa.parquet.ParquetFile(part)
+                for i in range(part_file.num_row_groups):
+                    writer.write_table(part_file.read_row_group(i))
+        return
+    with open(path, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out)
@@ -0,0 +1,139 @@
+import json
+import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+
+from backend.tracing import span
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Windows refuses to replace a file another process has open; such renames are retried
+REPLACE_RETRIES = 20
+REPLACE_DELAY = 0.05
+
+class LockTimeout(OSError):
+    """Raised when a file lock could not be acquired in time."""
+
+def new_file_mode():
+    """Permissions open() gives a new file: 0o666 less the process umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+@contextmanager
+def atomic_writer(path, mode='w', **open_kwargs):
+    """
+    Open a temporary file next to path for writing and, once the block completes, flush it to disk
+    and rename it over path. Readers see either the old or the new content, never a partial file;
+    if the block raises (or the process dies), path is left untouched.
+    The new file keeps the permissions of the one it replaces (or gets those of open() for a new
+    path), so other accounts sharing the data folder can still use it.
+    """
+    directory = os.path.dirname(path) or "."
+    try:
+        permissions = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        permissions = new_file_mode()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            # mkstemp creates the file readable by its owner only
+            os.chmod(tmp_path, permissions)
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+def _replace(source, target):
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if fcntl or attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_DELAY)
+
+def _fsync_directory(directory):
+    # Make the rename itself durable; not possible (nor needed) on Windows
+    if fcntl is None:
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Write data as JSON to path atomically (see atomic_writer)."""
+    with span(f"write {path}", "io"), atomic_writer(path, 'w') as f:
+        json.dump(data, f, **dump_kwargs)
+
+class FileLock:
+    """
+    Advisory lock shared by the processes using the same data folder, held on a separate lock file.
+    The lock is polled without blocking, backing off from RETRY_DELAY up to MAX_DELAY, so a lock
+    that is never released (e.g. on a stale network mount) ends in LockTimeout instead of a hang.
+    Shared locks are only available with fcntl; on Windows every lock is exclusive.
+    """
+    RETRY_DELAY = 0.001
+    MAX_DELAY = 0.02
+
+    def __init__(self, path, exclusive=True, timeout=30.0):
+        self.path = path
+        self.exclusive = exclusive
+        self.timeout = timeout
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)  # less the umask, as open() does
+        deadline = time.monotonic() + self.timeout
+        delay = self.RETRY_DELAY
+        while not self._try_lock():
+            if time.monotonic() >= deadline:
+                os.close(self.fd)
+                self.fd = None
+                raise LockTimeout(f"Timed out waiting for the lock on {self.path}")
+            time.sleep(delay)
+            delay = min(delay * 2, self.MAX_DELAY)
+        return self
+
+    def _try_lock(self):
+        try:
+            if fcntl:
+                fcntl.flock(self.fd, (fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_NBLCK, 1)
+        except (BlockingIOError, PermissionError):
+            return False
+        except OSError as e:
+            if fcntl is None:  # msvcrt reports a held lock as a generic OSError (EDEADLOCK / EACCES)
+                return False
+            raise
+        return True
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.fd)
+            self.fd = None
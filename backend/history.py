@@ -0,0 +1,106 @@
+# Layout of a history entry (version 2):
+#   {"version": 2, "date": "2025-01-02 20:42", "correct": 3, "total": 5,
+#    "categories": [{"category": "Python", "correct": 3, "total": 5}],
+#    "answers": [[category_index, question_index, choice, correct, seconds], ...]}
+# Each answer refers to an entry of "categories" and to the position of the question in that
+# category of the bank; choice is the index of the picked option in the bank's order (-1 when
+# time ran out), correct is 1 or 0 and seconds the time taken to answer.
+# Version 1 entries (no "version" field) stored scores as "correct/total" strings and are
+# upgraded when they are loaded.
+HISTORY_VERSION = 2
+
+def parse_score(score):
+    """
+    Split a "correct/total" score string into two integers.
+    """
+    correct, total = score.split('/')
+    return int(correct), int(total)
+
+def format_score(correct, total):
+    return f"{correct}/{total}"
+
+def make_entry(date, score, answers):
+    """
+    Build a history entry from the per-category score tuples (category, correct, total) and the
+    per-question outcomes (category, question_index, choice, correct, seconds) of a finished quiz.
+    """
+    category_index = {category: i for i, (category, _, _) in enumerate(score)}
+    return {
+        "version": HISTORY_VERSION,
+        "date": date,
+        "correct": sum(correct for _, correct, _ in score),
+        "total": sum(total for _, _, total in score),
+        "categories": [
+            {"category": category, "correct": correct, "total": total}
+            for category, correct, total in score
+        ],
+        "answers": [
+            [category_index[category], question_index, choice, int(correct), round(seconds, 1)]
+            for category, question_index, choice, correct, seconds in answers
+        ]
+    }
+
+def upgrade_entry(entry):
+    """
+    Return the entry in the current layout, converting version 1 entries.
+    """
+    if entry.get("version") == HISTORY_VERSION:
+        return entry
+    correct, total = parse_score(entry["total_score"])
+    categories = []
+    for cat in entry.get("categories", []):
+        cat_correct, cat_total = parse_score(cat["score"])
+        categories.append({"category": cat["category"], "correct": cat_correct, "total": cat_total})
+    return {
+        "version": HISTORY_VERSION,
+        "date": entry["date"],
+        "correct": correct,
+        "total": total,
+        "categories": categories,
+        "answers": []
+    }
+
+def upgrade_history(history):
+    """
+    Upgrade a history list in place and return it.
+    """
+    for i, entry in enumerate(history):
+        history[i] = upgrade_entry(entry)
+    return history
+
+def empty_stats():
+    """
+    Return empty running aggregates for a user: quiz count, overall correct/total
+    and [correct, total] per category, in order of first appearance.
+    """
+    return {"quizzes": 0, "correct": 0, "total": 0, "categories": {}}
+
+def copy_stats(stats):
+    return {
+        "quizzes": stats["quizzes"],
+        "correct": stats["correct"],
+        "total": stats["total"],
+        "categories": {category: list(scores) for category, scores in stats["categories"].items()}
+    }
+
+def add_to_stats(stats, entry):
+    """
+    Fold one history entry into a user's running aggregates, in O(categories of the entry).
+    """
+    stats["quizzes"] += 1
+    stats["correct"] += entry["correct"]
+    stats["total"] += entry["total"]
+    for cat in entry["categories"]:
+        scores = stats["categories"].setdefault(cat["category"], [0, 0])
+        scores[0] += cat["correct"]
+        scores[1] += cat["total"]
+    return stats
+
+def stats_from_history(history):
+    """
+    Compute a user's aggregates from their whole history (used to rebuild them).
+    """
+    stats = empty_stats()
+    for entry in history:
+        add_to_stats(stats, entry)
+    return stats
@@ -0,0 +1,205 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.answer_log import ANSWER_LOG, HEADER, MAGIC, RECORD, RECORD_FIELDS, VERSION, question_id
+
+# Records per task: each worker maps its own slice of the file, so only small arrays are sent back
+CHUNK_RECORDS = 4_000_000
+# Flags of the report
+EASY_ABOVE = 0.9
+HARD_BELOW = 0.2
+MIN_ANSWERS = 20  # below this, difficulty and discrimination are too noisy to flag
+# Per-quiz arrays shared with the workers of the second pass
+TOTALS = ("quizzes", "correct", "asked")
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Item analysis needs NumPy (pip install numpy)")
+    return numpy
+
+def record_count(path):
+    """Number of complete records in the log (a record cut short by a crash is left out)."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return 0
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} is not an answer log (version {VERSION})")
+    return (os.path.getsize(path) - HEADER.size) // RECORD.size
+
+def open_records(path, start=0, stop=None):
+    """Map records [start, stop) of the log as a NumPy structured array (read-only)."""
+    np = _numpy()
+    stop = record_count(path) if stop is None else stop
+    if stop <= start:
+        return np.zeros(0, dtype=np.dtype(RECORD_FIELDS))
+    return np.memmap(path, dtype=np.dtype(RECORD_FIELDS), mode="r",
+                     offset=HEADER.size + start * RECORD.size, shape=(stop - start,))
+
+def _quiz_totals(path, start, stop):
+    # First pass over a chunk: answers and right answers per quiz, questions seen, widest question
+    np = _numpy()
+    records = open_records(path, start, stop)
+    quizzes, inverse = np.unique(records["quiz"], return_inverse=True)
+    correct = np.bincount(inverse, weights=records["correct"], minlength=len(quizzes))
+    asked = np.bincount(inverse, minlength=len(quizzes))
+    return quizzes, correct, asked, np.unique(records["question"]), int(records["options"].max())
+
+def _item_sums(path, start, stop, totals, questions, width):
+    """
+    Second pass over a chunk: per question, the sums behind difficulty, the point-biserial
+    correlation with the rest of the quiz, answer times and the choice counts.
+    totals are the sorted quiz ids with their right answers and answers, or the folder where
+    they were saved for the worker processes.
+    """
+    np = _numpy()
+    if isinstance(totals, str):
+        totals = [np.load(os.path.join(totals, f"{name}.npy"), mmap_mode="r") for name in TOTALS]
+    quizzes, quiz_correct, quiz_asked = totals
+    records = open_records(path, start, stop)
+    item = np.searchsorted(questions, records["question"])
+    quiz = np.searchsorted(quizzes, records["quiz"])
+    x = records["correct"].astype(np.float64)
+
+    # Rest score: share of the other questions of the quiz answered right (quizzes of one question have none)
+    others = quiz_asked[quiz] - 1
+    has_rest = others > 0
+    rest = np.divide(quiz_correct[quiz] - x, others, out=np.zeros(len(x)), where=has_rest)
+    item_r, x_r, y_r = item[has_rest], x[has_rest], rest[has_rest]
+
+    n_items = len(questions)
+    sums = {
+        "answers": np.bincount(item, minlength=n_items),
+        "correct": np.bincount(item, weights=x, minlength=n_items),
+        "seconds": np.bincount(item, weights=records["seconds"], minlength=n_items),
+        "n": np.bincount(item_r, minlength=n_items),
+        "x": np.bincount(item_r, weights=x_r, minlength=n_items),
+        "y": np.bincount(item_r, weights=y_r, minlength=n_items),
+        "yy": np.bincount(item_r, weights=y_r * y_r, minlength=n_items),
+        "xy": np.bincount(item_r, weights=x_r * y_r, minlength=n_items),
+    }
+    # Column 0 counts timeouts (choice -1), column k + 1 the picks of option k
+    choices = np.bincount(item * (width + 1) + (records["choice"].astype(np.int64) + 1),
+                          minlength=n_items * (width + 1))
+    sums["choices"] = choices.reshape(n_items, width + 1)
+    return sums
+
+def _chunks(count, chunk_records):
+    return [(start, min(start + chunk_records, count)) for start in range(0, count, chunk_records)]
+
+def _map(pool, fn, path, chunks, *args):
+    if pool is None:
+        return [fn(path, start, stop, *args) for start, stop in chunks]
+    futures = [pool.submit(fn, path, start, stop, *args) for start, stop in chunks]
+    return [future.result() for future in futures]
+
+def analyze(path=ANSWER_LOG, workers=None, chunk_records=CHUNK_RECORDS):
+    """
+    Compute per-question statistics over the whole answer log, in chunks spread over worker
+    processes (workers=1 runs in this process). Returns a dict of NumPy arrays, one entry per
+    question id found in the log:
+      question        question ids
+      answers         number of answers (timeouts included)
+      difficulty      share of right answers (the p-value: high means easy)
+      discrimination  point-biserial correlation between getting the question right and the
+                      score on the rest of the quiz (near 0 or negative: the question does not
+                      separate strong from weak students, or its key is wrong)
+      mean_seconds    average time taken
+      choice_rates    rates of timeouts (column 0) and of each option in the bank's order
+    """
+    np = _numpy()
+    count = record_count(path)
+    if count == 0:
+        return None
+    chunks = _chunks(count, chunk_records)
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(min(workers, len(chunks))) if workers > 1 and len(chunks) > 1 else None
+    try:
+        # Merge the per-chunk quiz totals: a quiz's answers may sit in several chunks
+        parts = _map(pool, _quiz_totals, path, chunks)
+        quizzes, inverse = np.unique(np.concatenate([p[0] for p in parts]), return_inverse=True)
+        quiz_correct = np.bincount(inverse, weights=np.concatenate([p[1] for p in parts]), minlength=len(quizzes))
+        quiz_asked = np.bincount(inverse, weights=np.concatenate([p[2] for p in parts]), minlength=len(quizzes))
+        questions = np.unique(np.concatenate([p[3] for p in parts]))
+        width = max(p[4] for p in parts)
+        totals = (quizzes, quiz_correct, quiz_asked)
+
+        if pool is None:
+            parts = _map(pool, _item_sums, path, chunks, totals, questions, width)
+        else:
+            # Workers map the quiz totals from files instead of receiving a copy with every chunk
+            with tempfile.TemporaryDirectory() as folder:
+                for name, array in zip(TOTALS, totals):
+                    np.save(os.path.join(folder, f"{name}.npy"), array)
+                parts = _map(pool, _item_sums, path, chunks, folder, questions, width)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    sums = {key: sum(part[key] for part in parts) for key in parts[0]}
+
+    answers = sums["answers"]
+    n, sx, sy = sums["n"], sums["x"], sums["y"]
+    # Pearson correlation from the sums; x is 0/1, so the sum of x squared is the sum of x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = n * sums["xy"] - sx * sy
+        spread = (n * sx - sx * sx) * (n * sums["yy"] - sy * sy)
+        discrimination = np.where(spread > 0, covariance / np.sqrt(spread), np.nan)
+    return {
+        "question": questions,
+        "answers": answers,
+        "difficulty": sums["correct"] / answers,
+        "discrimination": discrimination,
+        "mean_seconds": sums["seconds"] / answers,
+        "choice_rates": sums["choices"] / answers[:, None],
+        "quizzes": len(quizzes),
+        "records": count,
+    }
+
+def flag(answers, difficulty, discrimination):
+    """Short verdict for one question of the report."""
+    if answers < MIN_ANSWERS:
+        return "few answers"
+    flags = []
+    if difficulty > EASY_ABOVE:
+        flags.append("too easy")
+    elif difficulty < HARD_BELOW:
+        flags.append("too hard")
+    if discrimination == discrimination and discrimination <= 0:  # not NaN
+        flags.append("check key")
+    return ", ".join(flags)
+
+def question_labels(question_bank):
+    """Map question ids to (category, position in the category, text) for the questions of the bank."""
+    labels = {}
+    for category in question_bank.categories():
+        for question in question_bank.load(category):
+            labels[question_id(category, question.text)] = (category, question.index, question.text)
+    return labels
+
+def report_rows(result, labels):
+    """Yield one row per question for the CSV report, the most answered first."""
+    np = _numpy()
+    width = result["choice_rates"].shape[1] - 1
+    for i in np.argsort(-result["answers"], kind="stable"):
+        question = int(result["question"][i])
+        category, index, text = labels.get(question, ("", "", "(not in the question bank)"))
+        answers = int(result["answers"][i])
+        difficulty = float(result["difficulty"][i])
+        discrimination = float(result["discrimination"][i])
+        rates = result["choice_rates"][i]
+        yield [
+            f"{question:016x}", category, index, text, answers, f"{difficulty:.3f}",
+            "" if discrimination != discrimination else f"{discrimination:.3f}",
+            f"{result['mean_seconds'][i]:.1f}", f"{rates[0]:.3f}",
+            *(f"{rate:.3f}" for rate in rates[1:width + 1]),
+            flag(answers, difficulty, discrimination),
+        ]
+
+def report_header(result):
+    width = result["choice_rates"].shape[1] - 1
+    return ["question_id", "category", "index", "question", "answers", "difficulty", "discrimination",
+            "mean_seconds", "timeout_rate", *(f"option_{k + 1}_rate" for k in range(width)), "flags"]
@@ -0,0 +1,180 @@
+import heapq
+import math
+import random
+import time
+from datetime import datetime
+
+# Leitner boxes: a right answer moves a question up one box and brings it back after that box's
+# interval (in seconds); a wrong answer or a timeout sends it back to box 0, due again at once.
+INTERVALS = [0, 24 * 3600, 3 * 24 * 3600, 7 * 24 * 3600, 21 * 24 * 3600, 60 * 24 * 3600]
+
+# A user's mastery table maps category -> {question index: (box, due, seen, correct)}, where due
+# is the Unix time the question should be reviewed again and seen/correct count its answers.
+
+def next_state(state, correct, now):
+    """Return the mastery state of a question after one more answer."""
+    box, _, seen, right = state or (0, 0.0, 0, 0)
+    box = min(box + 1, len(INTERVALS) - 1) if correct else 0
+    return (box, now + INTERVALS[box], seen + 1, right + bool(correct))
+
+def rows_from_history(history):
+    """
+    Build a mastery table by replaying the per-question outcomes of a history, oldest entry first
+    (for users whose results predate the table).
+    """
+    rows = {}
+    for entry in history:
+        now = datetime.strptime(entry["date"], "%Y-%m-%d %H:%M").timestamp()
+        categories = [cat["category"] for cat in entry["categories"]]
+        for category_index, index, _, correct, _ in entry["answers"]:
+            category_rows = rows.setdefault(categories[category_index], {})
+            category_rows[index] = next_state(category_rows.get(index), correct, now)
+    return rows
+
+class UnseenQueue:
+    """
+    The questions of a category in a random order, as the affine permutation i -> (start + step * i) mod n
+    (step coprime with n), so the order costs O(1) memory however big the category is.
+    position is the first place of the order that may still hold an unseen question.
+    """
+    __slots__ = ("n", "start", "step", "position")
+
+    def __init__(self, n, rng):
+        self.n = n
+        self.start = rng.randrange(n) if n else 0
+        step = rng.randrange(1, n) if n > 1 else 1
+        while math.gcd(step, n) != 1:
+            step = rng.randrange(1, n)
+        self.step = step
+        self.position = 0
+
+    def at(self, i):
+        return (self.start + self.step * i) % self.n
+
+class MasteryIndex:
+    """
+    Picks a user's next questions from their mastery table without rescanning it.
+    Each category has a heap of (due, index, seen) for the questions already seen, built on first
+    use, and an UnseenQueue for the others. Recording answers pushes the new states; the outdated
+    heap entries (whose seen count is behind the table's) are skipped when they come up and dropped
+    when they outnumber the live ones, so picking k questions costs O(k log n).
+    """
+    def __init__(self, username, rows, count, seed=None):
+        self.username = username
+        # A copy: the table passed in may be the user store's cache, which only update_mastery writes
+        self.rows = {category: dict(category_rows) for category, category_rows in rows.items()}
+        self.count = count  # category -> number of questions in the bank
+        self.rng = random.Random(seed)
+        self._heaps = {}
+        self._stale = {}
+        self._unseen = {}
+
+    def _heap(self, category):
+        heap = self._heaps.get(category)
+        if heap is None:
+            heap = self._heaps[category] = [
+                (state[1], index, state[2]) for index, state in self.rows.get(category, {}).items()
+            ]
+            heapq.heapify(heap)
+            self._stale[category] = 0
+        return heap
+
+    def _pop_valid(self, category):
+        heap = self._heap(category)
+        rows = self.rows.get(category, {})
+        while heap:
+            entry = heapq.heappop(heap)
+            _, index, seen = entry
+            if rows[index][2] == seen and index < self.count(category):
+                return entry
+            self._stale[category] = max(0, self._stale[category] - 1)
+        return None
+
+    def _take_unseen(self, category, k):
+        queue = self._unseen.get(category)
+        n = self.count(category)
+        if queue is None or queue.n != n:
+            queue = self._unseen[category] = UnseenQueue(n, self.rng)
+        seen = self.rows.get(category, {})
+        # Questions answered since the last pick are skipped for good
+        while queue.position < n and queue.at(queue.position) in seen:
+            queue.position += 1
+        picked = []
+        i = queue.position
+        while len(picked) < k and i < n:
+            index = queue.at(i)
+            if index not in seen:
+                picked.append(index)
+            i += 1
+        return picked
+
+    def pick(self, category, k, now=None):
+        """
+        Return up to k question indices of a category: questions due for review first (most overdue
+        first), then questions never seen, then the seen questions that will be due soonest.
+        """
+        now = time.time() if now is None else now
+        heap = self._heap(category)
+        popped = []
+        picked = []
+        while len(picked) < k:
+            entry = self._pop_valid(category)
+            if entry is None:
+                break
+            popped.append(entry)
+            if entry[0] > now:
+                break
+            picked.append(entry[1])
+        picked += self._take_unseen(category, k - len(picked))
+        for entry in popped:
+            if len(picked) < k and entry[0] > now:
+                picked.append(entry[1])
+        while len(picked) < k:
+            entry = self._pop_valid(category)
+            if entry is None:
+                break
+            popped.append(entry)
+            picked.append(entry[1])
+        # Picked questions stay in the heap until their answers are recorded (the quiz may be abandoned)
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return picked
+
+    def record(self, answers, now=None):
+        """
+        Update the table with the outcomes (category, index, choice, correct, seconds) of a quiz.
+        Returns the changed states, in the same layout as the table, for the user store.
+        """
+        now = time.time() if now is None else now
+        changes = {}
+        for category, index, _, correct, _ in answers:
+            category_rows = self.rows.setdefault(category, {})
+            previous = category_rows.get(index)
+            state = category_rows[index] = next_state(previous, correct, now)
+            changes.setdefault(category, {})[index] = state
+            heap = self._heaps.get(category)
+            if heap is not None:
+                heapq.heappush(heap, (state[1], index, state[2]))
+                if previous is not None:
+                    self._stale[category] += 1
+                if self._stale[category] > len(category_rows):
+                    del self._heaps[category]  # rebuilt without the outdated entries on next use
+        return changes
+
+def mastery_index(owner, replay=True):
+    """
+    Return the MasteryIndex of owner.current_user (owner being the app window or a server session),
+    building it on first use. Users with results but no table yet get it replayed from their history
+    once; with replay=False, None is returned for them instead (the replay will include later results).
+    """
+    index = owner.mastery
+    if index is None or index.username != owner.current_user:
+        users = owner.users
+        rows = users.get_mastery(owner.current_user)
+        if not rows and users.get_stats(owner.current_user)["quizzes"]:
+            if not replay:
+                return None
+            users.update_mastery(owner.current_user, rows_from_history(users.iter_history(owner.current_user)))
+            rows = users.get_mastery(owner.current_user)
+        index = owner.mastery = MasteryIndex(owner.current_user, rows, owner.question_bank.count)
+    return index
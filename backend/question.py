@@ -0,0 +1,62 @@
+import sys
+
+class Question:
+    """
+    A question of the bank.
+    Options are kept as a tuple of interned strings, so answers repeated across the bank
+    ("True", "None of these", ...) are stored once, and correct is the 0-based index of the right option.
+    """
+    __slots__ = ("text", "options", "correct", "category", "index")
+
+    def __init__(self, text, options, correct, category, index):
+        self.text = text
+        self.options = tuple(sys.intern(option) for option in options)
+        self.correct = correct
+        self.category = sys.intern(category)
+        self.index = index  # position of the question in its category
+
+    @classmethod
+    def from_record(cls, record, category, index):
+        """Build a question from a JSON record, whose "correct" field is a 1-based string."""
+        return cls(record["question"], record["options"], int(record["correct"]) - 1, category, index)
+
+    def shuffled(self, order):
+        """Return a view of the question with its options presented in the given order."""
+        return ShuffledQuestion(self, order)
+
+class ShuffledQuestion:
+    """
+    A question as shown in a quiz, with its options in a shuffled order.
+    Only the permutation is stored; the option strings are shared with the underlying question.
+    """
+    __slots__ = ("question", "order")
+
+    def __init__(self, question, order):
+        self.question = question
+        self.order = bytes(order)  # order[position] = index of the option in the original question
+
+    @property
+    def text(self):
+        return self.question.text
+
+    @property
+    def category(self):
+        return self.question.category
+
+    @property
+    def index(self):
+        return self.question.index
+
+    @property
+    def options(self):
+        options = self.question.options
+        return tuple(options[i] for i in self.order)
+
+    @property
+    def correct(self):
+        """0-based position of the right option in the shuffled order."""
+        return self.order.index(self.question.correct)
+
+    def original_option(self, position):
+        """Return the index in the original question of the option shown at position."""
+        return self.order[position]
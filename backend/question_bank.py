@@ -0,0 +1,116 @@
+import json
+import mmap
+import os
+import struct
+
+from backend.fileio import atomic_writer
+from backend.question import Question
+from backend.question_management import load_questions
+
+QUESTIONS_JSON = 'data/questions.json'
+QUESTIONS_BIN = 'data/questions.bin'
+
+# File layout: magic, format version, index length, then the JSON index and the category blobs.
+# The index maps each category to the offset, length and question count of its blob; a blob is a
+# compact JSON array of [question, options, correct] records.
+MAGIC = b"MCQB"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+
+def source_signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+def compile_questions(source=QUESTIONS_JSON, output=QUESTIONS_BIN):
+    """
+    Compile the JSON question bank into the indexed binary format. Returns the number of categories.
+    """
+    if source == QUESTIONS_JSON:
+        questions = load_questions()
+    else:
+        with open(source, 'r') as f:
+            questions = json.load(f)
+
+    blobs = []
+    categories = []
+    offset = 0
+    for category, items in questions.items():
+        blob = json.dumps(
+            [[q["question"], q["options"], q["correct"]] for q in items],
+            separators=(",", ":"),
+            ensure_ascii=False
+        ).encode()
+        categories.append([category, offset, len(blob), len(items)])
+        blobs.append(blob)
+        offset += len(blob)
+
+    index = json.dumps({"source": source_signature(source), "categories": categories}).encode()
+
+    # Written atomically, so an app instance opening the bank never maps a partial file
+    with atomic_writer(output, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    return len(categories)
+
+class QuestionBank:
+    """
+    Read-only view of a compiled question bank.
+    Opening it only reads the category index; the questions of a category are decoded from the
+    memory-mapped file the first time they are requested.
+    """
+    def __init__(self, path=QUESTIONS_BIN):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_length = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a compiled question bank (version {VERSION})")
+        index = json.loads(self.data[HEADER.size:HEADER.size + index_length])
+
+        self.source = index["source"]
+        self.base = HEADER.size + index_length
+        self.index = {name: (offset, length, count) for name, offset, length, count in index["categories"]}
+        self._loaded = {}
+
+    def categories(self):
+        """Return the category names, in the order of the source file."""
+        return list(self.index)
+
+    def count(self, category):
+        """Return the number of questions in a category."""
+        return self.index[category][2] if category in self.index else 0
+
+    def load(self, category):
+        """Return the questions of a category, decoding them on first use."""
+        if category not in self._loaded:
+            if category not in self.index:
+                return []
+            offset, length, _ = self.index[category]
+            start = self.base + offset
+            self._loaded[category] = [
+                Question(text, options, int(correct) - 1, category, index)
+                for index, (text, options, correct) in enumerate(json.loads(self.data[start:start + length]))
+            ]
+        return self._loaded[category]
+
+    def close(self):
+        self.data.close()
+
+def open_question_bank(source=QUESTIONS_JSON, path=QUESTIONS_BIN):
+    """
+    Open the compiled question bank, (re)compiling it first if it is missing or older than the JSON source.
+    """
+    if os.path.exists(path):
+        try:
+            bank = QuestionBank(path)
+        except (ValueError, struct.error):
+            bank = None
+        if bank is not None:
+            if not os.path.exists(source) or bank.source == source_signature(source):
+                return bank
+            bank.close()
+    compile_questions(source, path)
+    return QuestionBank(path)
@@ -2,6 +2,31 @@ import json
 import os
 import random
 
+from backend.answer_log import answer_log
+from backend.fileio import atomic_write_json
+from backend.mastery import mastery_index
+from backend.quiz_session import QuizSession
+from backend.tracing import span, traced
+
+# Below this many quizzes per call, the random module is faster than importing and setting up NumPy
+NUMPY_MIN_QUIZZES = 32
+
+_numpy = False  # not imported yet
+
+def numpy_module():
+    """
+    Import NumPy on first use, as it is slow to import and only pays off for large batches.
+    Returns None when it is not installed (it is optional).
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
 def load_questions():
     """
     Load the quiz questions from the JSON file. If the file does not exist or is empty, return a default set of questions.
@@ -41,76 +66,160 @@ def load_questions():
     }
     
     try:
-        with open('data/questions.json', 'r') as f:
+        with span("read data/questions.json", "io"), open('data/questions.json', 'r') as f:
             questions = json.load(f)
             return questions if questions else default_questions
     except (FileNotFoundError, json.JSONDecodeError):
         os.makedirs('data', exist_ok=True)
-        with open('data/questions.json', 'w') as f:
-            json.dump(default_questions, f, indent=4)
+        atomic_write_json('data/questions.json', default_questions, indent=4)
         return default_questions
 
+def allocate_questions(available, size, weights=None):
+    """
+    Split a quiz of the given size between categories, proportionally to their weights
+    (equal by default), without asking for more questions than a category has.
+    available maps each category to its number of questions; returns a dict category -> count.
+    """
+    weights = weights or {}
+    counts = {category: 0 for category in available}
+    remaining = min(size, sum(available.values()))
+
+    # Repeatedly share what is left among the categories that still have questions
+    while remaining > 0:
+        open_categories = [c for c in available if counts[c] < available[c] and weights.get(c, 1) > 0]
+        if not open_categories:
+            break
+        total_weight = sum(weights.get(c, 1) for c in open_categories)
+        shares = {c: remaining * weights.get(c, 1) / total_weight for c in open_categories}
+
+        # Largest remainder: whole parts first, then the biggest fractions, earlier categories winning ties
+        given = {c: int(shares[c]) for c in open_categories}
+        leftover = remaining - sum(given.values())
+        for c in sorted(open_categories, key=lambda c: given[c] - shares[c])[:leftover]:
+            given[c] += 1
+
+        for c in open_categories:
+            take = min(given[c], available[c] - counts[c])
+            counts[c] += take
+            remaining -= take
+    return counts
+
+def sample_quizzes(question_bank, categories, size, n=1, weights=None, seed=None):
+    """
+    Draw n independent quizzes of up to size questions from the given categories.
+    Each quiz is a list of ShuffledQuestion with randomized options and question order.
+    Unseeded batches of NUMPY_MIN_QUIZZES or more use NumPy when it is installed, so thousands of
+    quizzes are drawn with a few array operations per category. Reproducible (seeded) batches always
+    take the slower random module path, however large, so the same seed gives the same quizzes whether
+    or not NumPy is installed, and quiz i only depends on the seed (not on n).
+    """
+    if n <= 0:
+        return []
+    pools = {category: question_bank.load(category) for category in categories}
+    allocation = allocate_questions({c: len(pool) for c, pool in pools.items()}, size, weights)
+    if seed is None and n >= NUMPY_MIN_QUIZZES and numpy_module() is not None:
+        return _sample_quizzes_numpy(pools, allocation, n)
+
+    rng = random.Random(seed)
+    quizzes = []
+    for _ in range(n):
+        quiz = []
+        for category, count in allocation.items():
+            for q in rng.sample(pools[category], count):
+                order = list(range(len(q.options)))
+                rng.shuffle(order)
+                quiz.append(q.shuffled(order))
+        rng.shuffle(quiz)
+        quizzes.append(quiz)
+    return quizzes
+
+def _sample_quizzes_numpy(pools, allocation, n):
+    np = numpy_module()
+    rng = np.random.default_rng()
+
+    # picks[i] lists the questions of quiz i, category by category
+    picks = [[] for _ in range(n)]
+    for category, count in allocation.items():
+        if not count:
+            continue
+        pool = pools[category]
+        # Random sort keys give every quiz its own permutation; rows are processed in blocks to bound memory
+        block = max(1, (1 << 22) // len(pool))
+        for start in range(0, n, block):
+            rows = min(block, n - start)
+            chosen = rng.random((rows, len(pool))).argpartition(count - 1, axis=1)[:, :count]
+            for i, row in enumerate(chosen.tolist(), start):
+                picks[i].extend(pool[j] for j in row)
+
+    size = len(picks[0])
+    questions = [q for quiz in picks for q in quiz]
+
+    # Option orders, drawn at once for all questions with the same number of options
+    orders = [None] * len(questions)
+    lengths = np.fromiter((len(q.options) for q in questions), dtype=np.intp, count=len(questions))
+    for length in np.unique(lengths).tolist():
+        positions = np.flatnonzero(lengths == length)
+        for position, order in zip(positions.tolist(), rng.random((len(positions), length)).argsort(axis=1).tolist()):
+            orders[position] = order
+
+    question_orders = rng.random((n, size)).argsort(axis=1).tolist()
+    return [
+        [questions[i * size + j].shuffled(orders[i * size + j]) for j in question_orders[i]]
+        for i in range(n)
+    ]
+
+def new_quiz(question_bank, categories, size, weights=None, seed=None):
+    """
+    Start a quiz of up to size questions drawn from the given categories (balanced unless
+    weights are given), with randomized options. Returns a QuizSession.
+    """
+    if not categories:
+        return QuizSession([], [])
+    return QuizSession(categories, sample_quizzes(question_bank, categories, size, weights=weights, seed=seed)[0])
+
+def new_adaptive_quiz(mastery, question_bank, categories, size, weights=None, now=None, seed=None):
+    """
+    Start a quiz like new_quiz(), but with the questions a MasteryIndex picks for its user in each
+    category (due for review first, then unseen) instead of random ones. Returns a QuizSession.
+    """
+    if not categories:
+        return QuizSession([], [])
+    allocation = allocate_questions({c: question_bank.count(c) for c in categories}, size, weights)
+    rng = random.Random(seed)
+    quiz = []
+    for category, count in allocation.items():
+        if not count:
+            continue
+        pool = question_bank.load(category)
+        for i in mastery.pick(category, count, now):
+            q = pool[i]
+            order = list(range(len(q.options)))
+            rng.shuffle(order)
+            quiz.append(q.shuffled(order))
+    rng.shuffle(quiz)
+    return QuizSession(categories, quiz)
+
+@traced(category="quiz")
 def prepare_quiz(self):
     """
-    Prepare quiz questions based on selected categories, choosing a balanced selection 
-    of questions from each category up to a total of 7 questions, with randomized options.
+    Start a new quiz on self.quiz from the selected categories, with the configured quiz size and
+    category weights, adaptive when self.adaptive is set. Its answers go to the answer log unless
+    the answer_log setting is off.
     """
-    self.questions = []
-    self.score = []  # Initialize the score array
-    
-    if not self.selected_categories:
-        return
-        
-    # Calculate how many questions to take from each category
-    num_categories = len(self.selected_categories)
-    questions_per_category = 7 // num_categories  # Integer division
-    remaining_questions = 7 % num_categories
-    
-    # Get questions from each category
-    for category in self.selected_categories:
-        category_questions = self.all_questions.get(category, [])
-        
-        # Determine number of questions to take from this category
-        num_to_take = questions_per_category
-        if remaining_questions > 0:
-            num_to_take += 1
-            remaining_questions -= 1
-            
-        # Randomly select questions from this category
-        selected = random.sample(
-            category_questions,
-            min(num_to_take, len(category_questions))
+    if self.adaptive:
+        self.quiz = new_adaptive_quiz(
+            mastery_index(self),
+            self.question_bank,
+            self.selected_categories,
+            self.settings["quiz_size"],
+            weights=self.settings["category_weights"]
         )
-
-        # Add category information to each question and randomize options
-        for q in selected:
-            # Create pairs of options with their indices
-            options = q["options"]
-            correct_idx = int(q["correct"]) - 1
-            option_pairs = list(enumerate(options))
-
-            # Shuffle the pairs
-            random.shuffle(option_pairs)
-            
-            # Unpack the shuffled pairs
-            indices, shuffled_options = zip(*option_pairs)
-            
-            # Find where the correct answer went
-            new_correct = str(indices.index(correct_idx) + 1)
-            
-            self.questions.append({
-                "question": q["question"],
-                "options": list(shuffled_options),
-                "correct": new_correct,
-                "category": category
-            })
-            
-        # Initialize score tracking for this category
-        self.score.append((category, 0, 0))  # (category, current_score, num_questions)
-    
-    # Shuffle the final question list
-    random.shuffle(self.questions)
-    
-    # Ensure we don't exceed 7 questions total
-    self.questions = self.questions[:7]
-    self.current_question = 0
\ No newline at end of file
+    else:
+        self.quiz = new_quiz(
+            self.question_bank,
+            self.selected_categories,
+            self.settings["quiz_size"],
+            weights=self.settings["category_weights"]
+        )
+    if self.settings["answer_log"]:
+        self.quiz.on_answer = answer_log().recorder(self.current_user)
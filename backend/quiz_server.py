@@ -0,0 +1,328 @@
+import asyncio
+import json
+import secrets
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import backend.question_management as qm
+import backend.user_management as um
+from backend.auth_executor import AuthExecutor
+from backend.config import load_config
+from backend.question_bank import open_question_bank
+from backend.user_repository import UserRepository
+from backend.user_store import STORE_ERRORS, UserExistsError, open_user_store
+
+# Requests and responses are small JSON documents; anything bigger is refused
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 64 * 1024
+SESSION_TTL = 2 * 60 * 60  # seconds of inactivity before a session is dropped
+REAP_INTERVAL = 60
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 409: "Conflict",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Session:
+    """
+    State of one student, shaped like the app window for prepare_quiz() and save_score():
+    the quiz is a QuizSession, and settings, question bank and user store are the server's.
+    """
+    __slots__ = ("id", "server", "current_user", "selected_categories", "adaptive", "quiz", "mastery",
+                 "shown_at", "last_seen")
+
+    def __init__(self, session_id, server, username):
+        self.id = session_id
+        self.server = server
+        self.current_user = username
+        self.selected_categories = []
+        self.adaptive = server.settings["quiz_mode"] == "adaptive"
+        self.quiz = None
+        self.mastery = None  # the user's MasteryIndex, built by the first quiz
+        self.shown_at = 0.0
+        self.last_seen = time.monotonic()
+
+    @property
+    def settings(self):
+        return self.server.settings
+
+    @property
+    def question_bank(self):
+        return self.server.question_bank
+
+    @property
+    def users(self):
+        return self.server.users
+
+class QuizServer:
+    """
+    HTTP/1.1 JSON API serving quizzes to many students from one process.
+    Everything runs on the asyncio event loop (the user store included, as its connection belongs
+    to one thread) except bcrypt, which goes to the auth thread pool. Connections are kept alive.
+
+        POST /login   {"username", "password"}            -> {"session", "categories"}
+        POST /signup  {"username", "password"}            -> {"session", "categories"}
+        POST /quiz    {"session", "categories"}           -> {"question"}
+        POST /answer  {"session", "choice"}               -> {"correct", "correct_option", "question" | "result"}
+        POST /logout  {"session"}                         -> {}
+        GET  /categories                                  -> {"categories"}
+
+    /quiz also takes an optional "adaptive" flag (default: the quiz_mode setting), kept for the session's later quizzes.
+    """
+    def __init__(self, settings=None):
+        self.settings = settings or load_config()
+        self.users = UserRepository(open_user_store(self.settings))
+        self.question_bank = open_question_bank()
+        self.auth = AuthExecutor()
+        self.sessions = {}
+        self.routes = {
+            ("POST", "/login"): self.login,
+            ("POST", "/signup"): self.signup,
+            ("POST", "/quiz"): self.start_quiz,
+            ("POST", "/answer"): self.answer,
+            ("POST", "/logout"): self.logout,
+            ("GET", "/categories"): self.categories,
+        }
+
+    async def serve(self, host="127.0.0.1", port=8080, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        reaper = asyncio.create_task(self.reap_sessions())
+        if ready:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reaper.cancel()
+            self.close()
+
+    def close(self):
+        self.auth.shutdown()
+        self.users.close()
+        self.question_bank.close()
+
+    async def reap_sessions(self):
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            expired = time.monotonic() - SESSION_TTL
+            for session_id in [sid for sid, s in self.sessions.items() if s.last_seen < expired]:
+                del self.sessions[session_id]
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    method, path, headers, body = await read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as e:
+                    write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        handler = self.routes.get((method, urlsplit(path).path))
+        if handler is None:
+            return 404, {"error": f"No route for {method} {path}"}
+        try:
+            try:
+                request = json.loads(body) if body else {}
+            except ValueError as e:
+                raise HTTPError(400, f"Invalid JSON: {e}")
+            if not isinstance(request, dict):
+                raise HTTPError(400, "Expected a JSON object")
+            # Handlers validate their fields and raise HTTPError(400); anything else is a server error
+            return 200, await handler(request)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except STORE_ERRORS as e:
+            print(f"Store error handling {method} {path}: {e!r}")
+            return 500, {"error": f"Store error: {e}"}
+        except Exception as e:
+            print(f"Error handling {method} {path}: {e!r}")
+            return 500, {"error": "Internal error"}
+
+    def session(self, request):
+        session_id = request.get("session")
+        session = self.sessions.get(session_id) if isinstance(session_id, str) else None
+        if session is None:
+            raise HTTPError(401, "Unknown or expired session")
+        session.last_seen = time.monotonic()
+        return session
+
+    def open_session(self, username):
+        session = Session(secrets.token_urlsafe(16), self, username)
+        self.sessions[session.id] = session
+        return {"session": session.id, "categories": self.question_bank.categories()}
+
+    def credentials(self, request):
+        username = request.get("username")
+        password = request.get("password")
+        if not isinstance(username, str) or not isinstance(password, str):
+            raise HTTPError(400, "Username and password are required")
+        username = username.strip()
+        password = password.strip()
+        if not username or not password:
+            raise HTTPError(400, "Username and password are required")
+        return username, password
+
+    async def login(self, request):
+        username, password = self.credentials(request)
+        user = self.users.get_user(username)
+        loop = asyncio.get_running_loop()
+        valid, new_hash = await loop.run_in_executor(
+            self.auth.pool, um.verify_and_rehash, password, user["password"] if user else None,
+            self.settings["bcrypt_rounds"]
+        )
+        if not valid:
+            raise HTTPError(401, "Wrong username or password")
+        if new_hash:
+            self.users.set_password_hash(username, new_hash)
+        return self.open_session(username)
+
+    async def signup(self, request):
+        username, password = self.credentials(request)
+        if self.users.get_user(username) is not None:
+            raise HTTPError(409, "User already exists")
+        loop = asyncio.get_running_loop()
+        password_hash = await loop.run_in_executor(
+            self.auth.pool, um.hash_password, password, self.settings["bcrypt_rounds"]
+        )
+        # Checked again: another request may have taken the name while hashing
+        if self.users.get_user(username) is not None:
+            raise HTTPError(409, "User already exists")
+        try:
+            self.users.create_user(username, password_hash, datetime.now().strftime("%Y-%m-%d %H:%M"))
+        except UserExistsError:
+            # Taken by another process sharing the store
+            raise HTTPError(409, "User already exists")
+        return self.open_session(username)
+
+    async def logout(self, request):
+        self.sessions.pop(self.session(request).id, None)
+        return {}
+
+    async def categories(self, request):
+        return {"categories": self.question_bank.categories()}
+
+    async def start_quiz(self, request):
+        session = self.session(request)
+        requested = request.get("categories")
+        if not isinstance(requested, list):
+            raise HTTPError(400, "categories must be a list of category names")
+        categories = [c for c in requested if isinstance(c, str) and c in self.question_bank.index]
+        if not categories:
+            raise HTTPError(400, "Select at least one known category")
+        session.selected_categories = categories
+        if "adaptive" in request:
+            session.adaptive = bool(request["adaptive"])
+        qm.prepare_quiz(session)
+        if session.quiz.finished:
+            raise HTTPError(400, "No questions available")
+        return {"question": self.show_question(session)}
+
+    def show_question(self, session):
+        quiz = session.quiz
+        question = quiz.question
+        session.shown_at = time.monotonic()
+        return {
+            "number": quiz.current + 1,
+            "count": len(quiz.questions),
+            "category": question.category,
+            "text": question.text,
+            "options": question.options,
+            "time_limit": self.settings["question_time"],
+        }
+
+    async def answer(self, request):
+        session = self.session(request)
+        quiz = session.quiz
+        if quiz is None or quiz.finished:
+            raise HTTPError(409, "No quiz in progress")
+        question = quiz.question
+        choice = request.get("choice")
+        if not isinstance(choice, int) or isinstance(choice, bool) or not 0 <= choice < len(question.options):
+            raise HTTPError(400, f"choice must be an integer between 0 and {len(question.options) - 1}")
+
+        # Answers arriving after the time limit count as timed out, as in the app
+        seconds = time.monotonic() - session.shown_at
+        time_limit = self.settings["question_time"]
+        timed_out = 0 < time_limit < seconds
+        if timed_out:
+            quiz.time_out(seconds)
+            correct = False
+        else:
+            correct = quiz.answer(choice, seconds)
+
+        response = {"correct": correct, "timed_out": timed_out, "correct_option": question.correct}
+        if quiz.advance():
+            response["question"] = self.show_question(session)
+        else:
+            um.save_score(session)
+            response["result"] = {"correct": sum(quiz.correct), "total": sum(quiz.asked)}
+        return response
+
+async def read_request(reader):
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Request headers too large")
+    if len(head) > MAX_HEADER_SIZE:
+        raise HTTPError(413, "Request headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+    )
+
+def run_server(host="127.0.0.1", port=8080, settings=None):
+    """Serve quizzes until interrupted."""
+    server = QuizServer(settings)
+
+    def ready(listener):
+        addresses = ", ".join(str(sock.getsockname()[:2]) for sock in listener.sockets)
+        print(f"Serving quizzes on {addresses}", flush=True)
+
+    try:
+        asyncio.run(server.serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,124 @@
+SESSION_VERSION = 1
+
+class QuizSession:
+    """
+    State of one quiz, independent of any window: the drawn questions, the position in the quiz,
+    per-category counters and the outcome of every answered question.
+    Counters are lists indexed by category position (category_index maps names to positions),
+    so recording an answer is O(1). to_dict()/from_dict() pause and resume a quiz.
+    on_answer, when set, is called as on_answer(question, choice, correct, seconds) for every
+    answered or timed-out question (choice in the bank's order, -1 when time ran out).
+    """
+    __slots__ = ("categories", "category_index", "questions", "correct", "asked", "answers", "current", "on_answer")
+
+    def __init__(self, categories, questions):
+        self.categories = list(categories)
+        self.category_index = {category: i for i, category in enumerate(self.categories)}
+        self.questions = questions  # ShuffledQuestion objects, in the order they are asked
+        self.correct = [0] * len(self.categories)
+        self.asked = [0] * len(self.categories)
+        # (category, question index, chosen option in the bank's order or -1, correct, seconds) per answered question
+        self.answers = []
+        self.current = 0
+        self.on_answer = None
+
+    @property
+    def question(self):
+        """The question being asked, or None once the quiz is over."""
+        return self.questions[self.current] if self.current < len(self.questions) else None
+
+    @property
+    def finished(self):
+        return self.current >= len(self.questions)
+
+    @property
+    def answered(self):
+        """True once the current question has an outcome (it is then time to advance())."""
+        return len(self.answers) > self.current
+
+    def _unanswered(self):
+        question = self.question
+        if question is None:
+            raise ValueError("The quiz is over")
+        if self.answered:
+            raise ValueError("The current question is already answered")
+        return question
+
+    def _record(self, question, choice, correct, seconds):
+        i = self.category_index[question.category]
+        self.asked[i] += 1
+        self.correct[i] += correct
+        self.answers.append((question.category, question.index, choice, correct, seconds))
+        if self.on_answer is not None:
+            self.on_answer(question, choice, correct, seconds)
+
+    def answer(self, position, seconds=0.0):
+        """
+        Record the option picked at the given position of the current question and return whether it is right.
+        """
+        current = self.current
+        if current >= len(self.questions) or len(self.answers) > current:
+            self._unanswered()  # raises
+        shown = self.questions[current]
+        # Compared on the bank's option order, which spares the lookups behind ShuffledQuestion.correct
+        question = shown.question
+        choice = shown.order[position]
+        correct = choice == question.correct
+        i = self.category_index[question.category]
+        self.asked[i] += 1
+        self.correct[i] += correct
+        self.answers.append((question.category, question.index, choice, correct, seconds))
+        if self.on_answer is not None:
+            self.on_answer(question, choice, correct, seconds)
+        return correct
+
+    def time_out(self, seconds=0.0):
+        """Record that time ran out on the current question (it counts as wrong)."""
+        self._record(self._unanswered(), -1, False, seconds)
+
+    def time_out_remaining(self, seconds=0.0):
+        """End the quiz: every question without an outcome yet times out, the current one after seconds."""
+        for question in self.questions[len(self.answers):]:
+            self._record(question, -1, False, seconds if question is self.question else 0.0)
+        self.current = len(self.questions)
+
+    def advance(self):
+        """Move on to the next question. Returns False once the quiz is over."""
+        self.current += 1
+        return self.current < len(self.questions)
+
+    @property
+    def score(self):
+        """
+        (category, correct, asked) per selected category, as stored in the history. Categories left
+        without questions (small quiz_size or zero weight) are left out.
+        """
+        return [(category, correct, asked) for category, correct, asked in zip(self.categories, self.correct, self.asked) if asked]
+
+    def to_dict(self):
+        """Return the quiz as plain JSON-compatible data; the questions are referenced by category and index."""
+        return {
+            "version": SESSION_VERSION,
+            "categories": self.categories,
+            "questions": [[q.category, q.index, list(q.order)] for q in self.questions],
+            "correct": self.correct,
+            "asked": self.asked,
+            "answers": [list(answer) for answer in self.answers],
+            "current": self.current,
+        }
+
+    @classmethod
+    def from_dict(cls, data, question_bank):
+        """Resume a quiz saved with to_dict(), taking its questions from the same question bank."""
+        if data.get("version") != SESSION_VERSION:
+            raise ValueError(f"Unsupported quiz session version: {data.get('version')}")
+        questions = [
+            question_bank.load(category)[index].shuffled(order)
+            for category, index, order in data["questions"]
+        ]
+        session = cls(data["categories"], questions)
+        session.correct = list(data["correct"])
+        session.asked = list(data["asked"])
+        session.answers = [tuple(answer) for answer in data["answers"]]
+        session.current = data["current"]
+        return session
@@ -1,4 +1,3 @@
-import json
 def evaluate_performance(percentage):
     """Evaluate user performance based on percentage score."""
     if percentage >= 90:
@@ -27,53 +26,41 @@ def calculate_percentage(score):
 
     return (total_score / nb_questions) * 100
 
-def calculate_user_stats(username):
+def calculate_user_stats(users, username):
     """
-    Calculate user statistics based on quiz history.
+    Calculate user statistics from the running aggregates kept by the user store,
+    so the cost does not depend on the length of the quiz history.
     """
     try:
-            with open('data/users.json', 'r') as f:
-                users = json.load(f)
-                history = users[username]['history']
+        aggregates = users.get_stats(username)
 
-                if not history:
-                    return {
-                        "Overall Score": "No quizzes taken",
-                        "Total Questions": "0",
-                        "Quizzes Completed": "0"
-                    }
-
-                total_correct = 0
-                total_questions = 0
-                category_scores = {}
-
-                for entry in history:
-                    score_parts = entry['total_score'].split('/')
-                    total_correct += int(score_parts[0])
-                    total_questions += int(score_parts[1])
+        if not aggregates["quizzes"]:
+            return {
+                "Overall Score": "No quizzes taken",
+                "Total Questions": "0",
+                "Quizzes Completed": "0"
+            }
 
-                    for cat in entry['categories']:
-                        cat_name = cat['category']
-                        cat_score = cat['score'].split('/')
-                        if cat_name not in category_scores:
-                            category_scores[cat_name] = {'correct': 0, 'total': 0}
-                        category_scores[cat_name]['correct'] += int(cat_score[0])
-                        category_scores[cat_name]['total'] += int(cat_score[1])
+        total_correct = aggregates["correct"]
+        total_questions = aggregates["total"]
 
-                stats = {
-                    "Overall Score": f"{(total_correct/total_questions)*100:.1f}%",
-                    "Total Questions": str(total_questions),
-                    "Quizzes Completed": str(len(history))
-                }
+        stats = {
+            "Overall Score": f"{(total_correct/total_questions)*100 if total_questions else 0:.1f}%",
+            "Total Questions": str(total_questions),
+            "Quizzes Completed": str(aggregates["quizzes"])
+        }
 
-                for cat, scores in category_scores.items():
-                    percentage = (scores['correct'] / scores['total']) * 100
-                    stats[f"{cat}"] = f"{percentage:.1f}% ({scores['correct']}/{scores['total']})"
+        for cat, (correct, total) in aggregates["categories"].items():
+            if not total:
+                # Entries saved before empty categories were left out of the score
+                continue
+            percentage = (correct / total) * 100
+            stats[f"{cat}"] = f"{percentage:.1f}% ({correct}/{total})"
 
-                return stats
+        return stats
 
     except Exception as e:
-            print(f"Error calculating stats: {e}")
-            return {
-                "Error": "Could not load statistics"
-            }
+        print(f"Error calculating stats: {e}")
+        return {
+            "Error": "Could not load statistics"
+        }
@@ -0,0 +1,131 @@
+import functools
+import os
+import sys
+import threading
+import time
+
+# Set MCQ_TRACE=1 to trace into mcq-trace-<pid>.json in the working directory, or
+# MCQ_TRACE=path/to/trace.json to choose the file. The file is written when the process exits,
+# in the Chrome trace format (open it in chrome://tracing or https://ui.perfetto.dev), and a
+# summary per span name is printed to stderr.
+TRACE_ENV = "MCQ_TRACE"
+SUMMARY_ROWS = 30
+
+_setting = os.environ.get(TRACE_ENV, "")
+enabled = _setting not in ("", "0")
+
+# (name, category, start ns, duration ns, thread id, args) per finished span; list.append is
+# atomic, so spans from the auth and loader threads need no lock
+_events = []
+_thread_names = {}
+_origin = time.perf_counter_ns()
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        thread = threading.current_thread()
+        _thread_names.setdefault(thread.ident, thread.name)
+        _events.append((self.name, self.category, self.start, end - self.start, thread.ident, self.args))
+        return False
+
+def span(name, category="app", **args):
+    """
+    Context manager timing a block under the given name. When tracing is off this returns a
+    shared do-nothing object, so an instrumented block costs one call.
+    """
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+def traced(name=None, category="app"):
+    """
+    Decorator recording every call of a function as a span (named after the function by default).
+    When tracing is off the function is returned unchanged.
+    """
+    def decorate(fn):
+        if not enabled:
+            return fn
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(span_name, category, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def trace_path():
+    return f"mcq-trace-{os.getpid()}.json" if _setting == "1" else _setting
+
+def export_chrome_trace(path):
+    """Write the recorded spans as a Chrome trace ("X" complete events, microseconds)."""
+    import json
+    pid = os.getpid()
+    events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+        for tid, thread_name in _thread_names.items()
+    ]
+    for name, category, start, duration, tid, args in list(_events):
+        event = {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                 "ts": (start - _origin) / 1000, "dur": duration / 1000}
+        if args:
+            event["args"] = args
+        events.append(event)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+def summary():
+    """Return (name, category, count, total ms, mean ms, max ms) per span name, by total time."""
+    groups = {}
+    for name, category, _, duration, _, _ in list(_events):
+        groups.setdefault((name, category), []).append(duration)
+    rows = [
+        (name, category, len(durations), sum(durations) / 1e6, sum(durations) / len(durations) / 1e6, max(durations) / 1e6)
+        for (name, category), durations in groups.items()
+    ]
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows
+
+def print_summary(file=None):
+    file = file or sys.stderr
+    print(f"{'span':<40} {'category':<8} {'count':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}", file=file)
+    for name, category, count, total, mean, longest in summary()[:SUMMARY_ROWS]:
+        print(f"{name[:40]:<40} {category:<8} {count:>6} {total:>10.2f} {mean:>9.3f} {longest:>9.3f}", file=file)
+
+def _write_at_exit():
+    if not _events:
+        return
+    path = trace_path()
+    try:
+        export_chrome_trace(path)
+    except OSError as e:
+        print(f"Could not write the trace to {path}: {e}", file=sys.stderr)
+    else:
+        print(f"Trace of {len(_events)} spans written to {path}", file=sys.stderr)
+    print_summary()
+
+if enabled:
+    import atexit
+    atexit.register(_write_at_exit)
@@ -1,55 +1,30 @@
-import json
-import bcrypt
 from datetime import datetime
 import os
-import csv
-import gui.front as fr
+import time
+from backend.history import make_entry
+from backend.mastery import mastery_index
+from backend.tracing import traced
+from backend.user_store import STORE_ERRORS, UserExistsError
 
 def ensure_data_directory():
     os.makedirs('data', exist_ok=True)
 
-def load_users():
-    """
-    Load the user data from the JSON file. If the file does not exist or is empty, return an empty dictionary.
-    """
-    try:
-        with open('data/users.json', 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
 def save_score(parent):
     """
-    Save the quiz score to the user's history field in the JSON file.
+    Save the quiz score and the outcome of every question to the user's history in the user store,
+    and update the user's mastery table with those outcomes (once the user has one, see backend.mastery).
     """
+    quiz = parent.quiz
+    history_entry = make_entry(datetime.now().strftime("%Y-%m-%d %H:%M"), quiz.score, quiz.answers)
+
     try:
-        with open('data/users.json', 'r') as f:
-            users = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        # Looked up before the entry is added: a first quiz starts the user's table
+        mastery = mastery_index(parent, replay=False)
+        parent.users.append_history(parent.current_user, history_entry)
+        if mastery is not None:
+            parent.users.update_mastery(parent.current_user, mastery.record(quiz.answers, time.time()))
+    except STORE_ERRORS as e:
         print("Error:", e)
-        return
-
-    nb_questions = 0
-    total_score = 0
-
-    for i, (cat, current_score, num_questions) in enumerate(parent.score):
-        nb_questions += num_questions
-        total_score += current_score
-
-    # Create the new history entry
-    history_entry = {
-        "total_score": f"{total_score}/{nb_questions}",
-        "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "categories": [
-            {"category": cat, "score": f"{current_score}/{num_questions}"}
-            for i, (cat, current_score, num_questions) in enumerate(parent.score)
-        ]
-    }
-
-    users[parent.current_user]["history"].append(history_entry)
-
-    with open('data/users.json', 'w') as f:
-        json.dump(users, f, indent=4)
 
 def check_fields(self):
     """
@@ -74,75 +49,167 @@ def check_fields(self):
             return False
     except AttributeError:
         pass
-    # Load user data
-    try:
-        with open('data/users.json', 'r') as file:
-            users = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        display_feedback(self, "⚠️" + e.msg, "yellow")
+
+    return True, username, password
+
+# bcrypt is imported by the functions that hash, so it is not loaded until the first login or signup.
+
+# Hashes checked when the username is unknown, one per bcrypt cost, so a failed login costs the
+# same single bcrypt verify whether or not the account exists
+_dummy_hashes = {}
+
+@traced(category="bcrypt")
+def hash_password(password, rounds):
+    """
+    Hash a password with a fresh salt at the given bcrypt cost. Safe to call from a worker thread.
+    """
+    import bcrypt
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+def hash_rounds(stored_hash):
+    """
+    Return the bcrypt cost a hash was created with ("$2b$12$..." -> 12).
+    """
+    return int(stored_hash.split("$")[2])
+
+@traced(category="bcrypt")
+def verify_password(password, stored_hash, rounds):
+    """
+    Check a password against a stored hash (None for an unknown user, checked against a dummy hash
+    of the configured cost rounds). Safe to call from a worker thread.
+    """
+    import bcrypt
+    if stored_hash is None:
+        if rounds not in _dummy_hashes:
+            _dummy_hashes[rounds] = bcrypt.hashpw(b"", bcrypt.gensalt(rounds=rounds))
+        bcrypt.checkpw(password.encode(), _dummy_hashes[rounds])
         return False
+    return bcrypt.checkpw(password.encode(), stored_hash.encode())
 
-    return True, username, password, users
+def verify_and_rehash(password, stored_hash, rounds):
+    """
+    Check a password and, if it matches a hash made with a different cost, hash it again at the configured cost.
+    Returns (valid, new_hash), new_hash being None when no rehash was needed. Safe to call from a worker thread.
+    """
+    if not verify_password(password, stored_hash, rounds):
+        return False, None
+    if hash_rounds(stored_hash) != rounds:
+        return True, hash_password(password, rounds)
+    return True, None
+
+def calibrate_rounds(target_ms, min_rounds=4, max_rounds=16):
+    """
+    Return the highest bcrypt cost whose verify takes at most target_ms on this machine
+    (never lower than min_rounds). Each extra round doubles the work.
+    """
+    import bcrypt
+    rounds = min_rounds
+    for candidate in range(min_rounds, max_rounds + 1):
+        stored_hash = bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=candidate))
+        start = time.perf_counter()
+        bcrypt.checkpw(b"calibration", stored_hash)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms:
+            break
+        rounds = candidate
+    return rounds
+
+def run_in_background(app, owner, button, on_done, fn, *args):
+    """
+    Run a bcrypt task on the app's auth executor with the button disabled, then pass the result
+    to on_done on the Tk thread. Ignored while a previous task of the same owner is still running.
+    The result is dropped if the owner was destroyed or, for a screen, hidden in the meantime.
+    """
+    if getattr(owner, "auth_pending", False):
+        return
+    owner.auth_pending = True
+    button.configure(state="disabled")
+
+    def finished(future):
+        owner.auth_pending = False
+        if not owner.winfo_exists():
+            return
+        button.configure(state="normal")
+        if not getattr(owner, "shown", True):
+            return
+        on_done(future.result())
+
+    app.auth.run(app, finished, fn, *args)
 
 def check_user_login(self):
     """
     Check if the user exists in the user data and if the password is correct. If so, log in the user.
+    The bcrypt verify runs on the auth executor so the window stays responsive.
     """
     result = check_fields(self)
     if not result:
         return
     username = result[1]
     password = result[2]
-    users = result[3]
 
-    for user in users:
-        if user == username and bcrypt.checkpw(password.encode(), users[user]["password"].encode()):
-            self.master.current_user = username
-            self.master.current_userdata = users[user]
-            self.master.show_frame("mode" if not users[username] else "welcome")
+    try:
+        user = self.master.users.get_user(username)
+    except STORE_ERRORS as e:
+        display_feedback(self, "⚠️" + str(e), "yellow")
+        return
+
+    def done(result):
+        valid, new_hash = result
+        if not valid:
+            display_feedback(self, f"👤 Wrong username or password", "red")
             return
+        if new_hash:
+            self.master.users.set_password_hash(username, new_hash)
+        self.master.current_user = username
+        self.master.current_userdata = user
+        self.master.show_frame("mode" if not user else "welcome")
 
-    display_feedback(self, f"👤 Wrong username or password", "red")
-    return
+    run_in_background(self.master, self, self.login_button, done, verify_and_rehash,
+                      password, user["password"] if user else None, self.master.settings["bcrypt_rounds"])
 
 def check_user_singup(self):
     """
-    Check if the user already exists in the user data. If not, create a new user."""
+    Check if the user already exists in the user data. If not, create a new user.
+    The password is hashed on the auth executor so the window stays responsive."""
     result = check_fields(self)
     if not result:
         return
     username = result[1]
     password = result[2]
-    users = result[3]
 
-    hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    try:
+        taken = self.master.users.get_user(username) is not None
+    except STORE_ERRORS as e:
+        display_feedback(self, "⚠️" + str(e), "yellow")
+        return
 
-    for user in users:
-        if user == username and bcrypt.checkpw(password.encode(), hashed_password.encode()):
+    if taken:
+        display_feedback(self,"⚠️ User already exists!.", "yellow")
+        return
+
+    def done(hashed_password):
+        try:
+            # Another instance sharing the store may have taken the name while hashing
+            user = self.master.users.create_user(username, hashed_password, datetime.now().strftime("%Y-%m-%d %H:%M"))
+        except UserExistsError:
             display_feedback(self,"⚠️ User already exists!.", "yellow")
             return
-    new_user = {
-        username: {
-            "password": hashed_password,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "history": []
-        },
-    }
-
-    users.update(new_user)
-    with open('data/users.json', 'w') as file:
-        json.dump(users, file, indent=4)
+        except STORE_ERRORS as e:
+            display_feedback(self, "⚠️" + str(e), "yellow")
+            return
+        self.master.current_user = username
+        self.master.current_userdata = user
+        self.master.show_frame("mode" if not user else "welcome")
 
-    self.master.current_user = username
-    self.master.current_userdata = new_user[username]
-    self.master.show_frame("mode" if not users[username] else "welcome")
+    run_in_background(self.master, self, self.signup_button, done, hash_password,
+                      password, self.master.settings["bcrypt_rounds"])
 
-def export_csv(username, file_path=None):
+def export_csv(users, username, file_path=None):
     """
     Export the user's quiz history to a CSV file.
     """
-    users = load_users()
-    if username not in users.keys():
+    user = users.get_user(username)
+    if user is None:
         return False, "User not found"
     
     # If no file path provided, create default in current directory
@@ -151,16 +218,8 @@ def export_csv(username, file_path=None):
         file_path = os.path.join(os.getcwd(), default_filename)
     
     try:
-        history = users[username]["history"]
-
-        file = open(file_path, mode="w", newline="")
-        writer = csv.writer(file)
-        writer.writerow(["Date", "Total Score", "Category", "Category Score"])
-        for entry in history:
-            date = entry["date"]
-            total_score = entry["total_score"]
-            writer.writerows([[date, total_score, cat["category"], cat["score"]] for cat in entry["categories"]])
-
+        from backend.export import export_user_csv  # pulls in multiprocessing, not needed at startup
+        export_user_csv(users, username, file_path)
         return True, f"Successfully exported to {file_path}"
     
     except Exception as e:
@@ -174,7 +233,7 @@ def display_feedback(self, message, color):
     self.feedback_label.configure(text=message, text_color=color)
     self.after(3000, lambda: self.feedback_label.configure(text=""))
 
-def validate_and_delete(dialog, password_entry, confirm_entry, feedback_label, master):
+def validate_and_delete(dialog, password_entry, confirm_entry, feedback_label, master, delete_button):
    
     password = password_entry.get()
     confirm = confirm_entry.get()
@@ -184,17 +243,23 @@ def validate_and_delete(dialog, password_entry, confirm_entry, feedback_label, m
         return
 
     try:
-        with open('data/users.json', 'r') as f:
-            users = json.load(f)
-            stored_hash = users[master.current_user]["password"]
-            
-        if bcrypt.checkpw(password.encode(), stored_hash.encode()):
-            del users[master.current_user]
-            with open('data/users.json', 'w') as f:
-                json.dump(users, f, indent=4)
-            dialog.destroy()
-            master.show_frame("start")
-        else:
-            feedback_label.configure(text="Incorrect password!")
+        store = master.users
+        stored_hash = store.get_user(master.current_user)["password"]
     except Exception as e:
-        feedback_label.configure(text="An error occurred!")
\ No newline at end of file
+        feedback_label.configure(text="An error occurred!")
+        return
+
+    def done(valid):
+        if not valid:
+            feedback_label.configure(text="Incorrect password!")
+            return
+        try:
+            store.delete_user(master.current_user)
+        except Exception as e:
+            feedback_label.configure(text="An error occurred!")
+            return
+        dialog.destroy()
+        master.show_frame("start")
+
+    run_in_background(master, dialog, delete_button, done, verify_password,
+                      password, stored_hash, master.settings["bcrypt_rounds"])
@@ -0,0 +1,138 @@
+from backend.history import add_to_stats, empty_stats
+from backend.user_store import open_user_store
+
+class UserRepository:
+    """
+    In-process cache in front of a user store.
+    Accounts, statistics and mastery tables are fetched once and kept in memory; changes are written
+    through to the store and applied to the cache. The cache is dropped only when the store's backing
+    files change on disk (another process wrote to them), which is detected from their modification
+    time and size. Returned records are shared with the cache and must be treated as read-only.
+    History pages are not cached here: their reader keeps the few it needs (see gui.front.HistoryList).
+    """
+    def __init__(self, store=None):
+        self.store = store if store is not None else open_user_store()
+        self._users = {}
+        self._stats = {}
+        self._mastery = {}
+        self._complete = False
+        self._signature = self.store.signature()
+
+    def _drop(self):
+        self._users = {}
+        self._stats = {}
+        self._mastery = {}
+        self._complete = False
+
+    def _validate(self):
+        signature = self.store.signature()
+        if signature is None or signature != self._signature:
+            self._drop()
+            self._signature = signature
+
+    def _written(self, before):
+        """
+        Adopt the signature left by our own write, given the one taken right before it. If the files
+        had changed since the last check, another process wrote to them and the new signature covers
+        its change too, so the cache is dropped instead.
+        """
+        if before is None or before != self._signature:
+            self._drop()
+        self._signature = self.store.signature()
+
+    def load_all(self):
+        """Return every user record, with its history, keyed by username."""
+        self._validate()
+        if not self._complete:
+            self._users = self.store.load_all()
+            self._complete = True
+        return self._users
+
+    def get_user(self, username):
+        """Return the account of a single user, or None if the user does not exist."""
+        self._validate()
+        if username not in self._users:
+            if self._complete:
+                return None
+            user = self.store.get_user(username)
+            if user is None:
+                return None
+            self._users[username] = user
+        return self._users[username]
+
+    def get_history(self, username):
+        """Return the whole quiz history of a user, oldest entry first."""
+        self._validate()
+        if self._complete and username in self._users:
+            return self._users[username]["history"]
+        return self.store.get_history(username)
+
+    def iter_history(self, username):
+        """Yield the quiz history of a user, oldest entry first, streaming it from the store when it is not cached."""
+        self._validate()
+        if self._complete and username in self._users:
+            return iter(self._users[username]["history"])
+        return self.store.iter_history(username)
+
+    def get_history_page(self, username, offset, limit):
+        """Return up to limit history entries of a user, newest first, skipping the offset newest ones."""
+        return self.store.get_history_page(username, offset, limit)
+
+    def get_stats(self, username):
+        """Return the running aggregates of a user's quiz results."""
+        self._validate()
+        if username not in self._stats:
+            self._stats[username] = self.store.get_stats(username)
+        return self._stats[username]
+
+    def create_user(self, username, password_hash, created_at):
+        before = self.store.signature()
+        self.store.create_user(username, password_hash, created_at)
+        user = {"password": password_hash, "created_at": created_at, "history": []}
+        self._users[username] = user
+        self._stats[username] = empty_stats()
+        self._written(before)
+        return user
+
+    def delete_user(self, username):
+        before = self.store.signature()
+        self.store.delete_user(username)
+        self._users.pop(username, None)
+        self._stats.pop(username, None)
+        self._mastery.pop(username, None)
+        self._written(before)
+
+    def append_history(self, username, entry):
+        before = self.store.signature()
+        self.store.append_history(username, entry)
+        if self._complete and username in self._users:
+            self._users[username]["history"].append(entry)
+        if username in self._stats:
+            add_to_stats(self._stats[username], entry)
+        self._written(before)
+
+    def set_password_hash(self, username, password_hash):
+        before = self.store.signature()
+        self.store.set_password_hash(username, password_hash)
+        if username in self._users:
+            self._users[username]["password"] = password_hash
+        self._written(before)
+
+    def get_mastery(self, username):
+        """Return the mastery table of a user (see backend.mastery)."""
+        self._validate()
+        if username not in self._mastery:
+            self._mastery[username] = self.store.get_mastery(username)
+        return self._mastery[username]
+
+    def update_mastery(self, username, changes):
+        before = self.store.signature()
+        self.store.update_mastery(username, changes)
+        if username in self._mastery:
+            mastery = self._mastery[username]
+            for category, rows in changes.items():
+                mastery.setdefault(category, {}).update(rows)
+        self._written(before)
+
+    def close(self):
+        self.store.close()
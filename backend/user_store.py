@@ -0,0 +1,779 @@
+import json
+import os
+import sqlite3
+import time
+
+from backend.config import load_config
+from backend.fileio import FileLock, atomic_write_json
+from backend.tracing import span
+from backend.history import (
+    HISTORY_VERSION, add_to_stats, copy_stats, empty_stats, stats_from_history, upgrade_entry, upgrade_history
+)
+
+USERS_JSON = 'data/users.json'
+USERS_DB = 'data/users.db'
+USERS_SNAPSHOT = 'data/users.snapshot.json'
+USERS_JOURNAL = 'data/users.journal.jsonl'
+
+# Errors a store may raise when its backing file is missing, unreadable or corrupted
+STORE_ERRORS = (OSError, ValueError, sqlite3.Error)
+
+class UserExistsError(ValueError):
+    """Raised by create_user when the name is already taken (possibly by another process)."""
+
+def file_signature(*paths):
+    """
+    Return the modification time and size of each path (None for missing files).
+    """
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+class UserStore:
+    """
+    Interface shared by the user storage backends.
+    A user record is a dictionary with the "password", "created_at" and "history" fields,
+    as in the original users.json layout. History entries are returned in the current layout
+    of backend.history, older entries being upgraded as they are loaded.
+    """
+    def load_all(self):
+        """Return every user record, keyed by username."""
+        raise NotImplementedError
+
+    def get_user(self, username):
+        """
+        Return the account of a single user (at least "password" and "created_at"),
+        or None if the user does not exist. The history is fetched separately.
+        """
+        raise NotImplementedError
+
+    def get_history(self, username):
+        """Return the quiz history of a user, oldest entry first."""
+        raise NotImplementedError
+
+    def iter_history(self, username):
+        """Yield the quiz history of a user, oldest entry first, without materializing it when the backend allows."""
+        return iter(self.get_history(username))
+
+    def usernames(self):
+        """Return the names of all users, in creation order."""
+        return list(self.load_all())
+
+    def get_history_page(self, username, offset, limit):
+        """Return up to limit history entries of a user, newest first, skipping the offset newest ones."""
+        history = self.get_history(username)
+        end = len(history) - offset
+        return history[max(0, end - limit):max(0, end)][::-1]
+
+    def create_user(self, username, password_hash, created_at):
+        """Add a new user with an empty history; raises UserExistsError if the name is taken."""
+        raise NotImplementedError
+
+    def delete_user(self, username):
+        """Remove a user together with their history."""
+        raise NotImplementedError
+
+    def append_history(self, username, entry):
+        """Append one quiz result to the user's history."""
+        raise NotImplementedError
+
+    def set_password_hash(self, username, password_hash):
+        """Replace the stored password hash of a user."""
+        raise NotImplementedError
+
+    def get_stats(self, username):
+        """Return the running aggregates of a user's quiz results (see history.empty_stats)."""
+        raise NotImplementedError
+
+    def rebuild_stats(self):
+        """Recompute every user's aggregates from their full history."""
+        raise NotImplementedError
+
+    def get_mastery(self, username):
+        """Return the mastery table of a user (see backend.mastery): {category: {question index: state}}."""
+        raise NotImplementedError
+
+    def update_mastery(self, username, changes):
+        """Store the given states (same layout as get_mastery) in the user's mastery table."""
+        raise NotImplementedError
+
+    def signature(self):
+        """
+        Return a cheap fingerprint of the backing files that changes whenever the stored data changes,
+        or None if the backend cannot tell.
+        """
+        return None
+
+    def close(self):
+        pass
+
+    @classmethod
+    def from_config(cls, config):
+        """Create the store with the settings found in the application config."""
+        return cls()
+
+class JsonUserStore(UserStore):
+    """
+    Legacy backend: the whole user base lives in a single JSON file that is rewritten on every change.
+    Each change reads, modifies and atomically replaces the file while holding an exclusive lock on
+    a side file, so concurrent processes never lose each other's writes. Reads take no lock: the
+    file is only ever replaced whole.
+    """
+    def __init__(self, path=USERS_JSON):
+        self.path = path
+        self.lock_path = path + ".lock"
+
+    def load_all(self):
+        try:
+            with span(f"read {self.path}", "io"), open(self.path, 'r') as f:
+                users = json.load(f)
+        except FileNotFoundError:
+            return {}
+        for user in users.values():
+            upgrade_history(user["history"])
+        return users
+
+    def _save_all(self, users):
+        atomic_write_json(self.path, users, separators=(",", ":"))
+
+    def _locked(self):
+        return FileLock(self.lock_path)
+
+    def signature(self):
+        return file_signature(self.path)
+
+    def get_user(self, username):
+        return self.load_all().get(username)
+
+    def get_history(self, username):
+        user = self.get_user(username)
+        return user["history"] if user else []
+
+    def create_user(self, username, password_hash, created_at):
+        with self._locked():
+            users = self.load_all()
+            if username in users:
+                raise UserExistsError(f"User {username} already exists")
+            users[username] = {
+                "password": password_hash,
+                "created_at": created_at,
+                "history": [],
+                "stats": empty_stats()
+            }
+            self._save_all(users)
+
+    def delete_user(self, username):
+        with self._locked():
+            users = self.load_all()
+            if users.pop(username, None) is not None:
+                self._save_all(users)
+
+    def append_history(self, username, entry):
+        with self._locked():
+            users = self.load_all()
+            user = users.get(username)
+            if user is None:
+                # Deleted by another instance, as the other backends ignore it
+                return
+            # Files written before aggregates existed get them on their first new result
+            user["stats"] = add_to_stats(user.get("stats") or stats_from_history(user["history"]), entry)
+            user["history"].append(entry)
+            self._save_all(users)
+
+    def set_password_hash(self, username, password_hash):
+        with self._locked():
+            users = self.load_all()
+            if username in users:
+                users[username]["password"] = password_hash
+                self._save_all(users)
+
+    def get_stats(self, username):
+        user = self.get_user(username)
+        if user is None:
+            return empty_stats()
+        return user.get("stats") or stats_from_history(user["history"])
+
+    def rebuild_stats(self):
+        with self._locked():
+            users = self.load_all()
+            for user in users.values():
+                user["stats"] = stats_from_history(user["history"])
+            self._save_all(users)
+
+    def get_mastery(self, username):
+        user = self.get_user(username)
+        return mastery_from_json(user.get("mastery", {})) if user else {}
+
+    def update_mastery(self, username, changes):
+        with self._locked():
+            users = self.load_all()
+            if username in users:
+                merge_mastery_json(users[username].setdefault("mastery", {}), changes)
+                self._save_all(users)
+
+class SqliteUserStore(UserStore):
+    """
+    Default backend: users and their quiz history live in indexed SQLite tables,
+    so saving a score is a single INSERT instead of a rewrite of the whole user base.
+    """
+    HISTORY_TABLE = """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            date TEXT NOT NULL,
+            correct INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            categories TEXT NOT NULL,
+            answers TEXT NOT NULL
+        )
+    """
+    HISTORY_INDEX = "CREATE INDEX IF NOT EXISTS history_user ON history(user_id, id)"
+    SCHEMA = f"""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        {HISTORY_TABLE};
+        {HISTORY_INDEX};
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            quizzes INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            total INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS category_stats (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            category TEXT NOT NULL,
+            correct INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            UNIQUE (user_id, category)
+        );
+        CREATE TABLE IF NOT EXISTS mastery (
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            category TEXT NOT NULL,
+            question INTEGER NOT NULL,
+            box INTEGER NOT NULL,
+            due REAL NOT NULL,
+            seen INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            PRIMARY KEY (user_id, category, question)
+        ) WITHOUT ROWID;
+    """
+    # Bumped whenever existing databases need a data migration (PRAGMA user_version)
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path=USERS_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(history)")]
+        if "total_score" in columns:
+            # History written with "correct/total" strings
+            self._upgrade_history_table()
+        if version < 1:
+            # Databases created before the aggregate tables existed
+            self.rebuild_stats()
+        if version < self.SCHEMA_VERSION:
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _upgrade_history_table(self):
+        rows = self.conn.execute("SELECT id, user_id, date, total_score, categories FROM history ORDER BY id").fetchall()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DROP INDEX history_user")
+            self.conn.execute("ALTER TABLE history RENAME TO history_v1")
+            self.conn.execute(self.HISTORY_TABLE)
+            self.conn.execute(self.HISTORY_INDEX)
+            self.conn.executemany(
+                "INSERT INTO history (id, user_id, date, correct, total, categories, answers) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (history_id, user_id, *self._history_row(upgrade_entry(
+                        {"date": date, "total_score": total_score, "categories": json.loads(categories)}
+                    )))
+                    for history_id, user_id, date, total_score, categories in rows
+                ]
+            )
+            self.conn.execute("DROP TABLE history_v1")
+
+    @staticmethod
+    def _history_row(entry):
+        # Categories and answers are stored as compact JSON arrays
+        return (
+            entry["date"],
+            entry["correct"],
+            entry["total"],
+            json.dumps([[cat["category"], cat["correct"], cat["total"]] for cat in entry["categories"]], separators=(",", ":")),
+            json.dumps(entry["answers"], separators=(",", ":"))
+        )
+
+    @staticmethod
+    def _history_entry(row):
+        date, correct, total, categories, answers = row
+        return {
+            "version": HISTORY_VERSION,
+            "date": date,
+            "correct": correct,
+            "total": total,
+            "categories": [
+                {"category": category, "correct": cat_correct, "total": cat_total}
+                for category, cat_correct, cat_total in json.loads(categories)
+            ],
+            "answers": json.loads(answers)
+        }
+
+    def load_all(self):
+        users = {}
+        ids = {}
+        for user_id, username, password, created_at in self.conn.execute(
+                "SELECT id, username, password, created_at FROM users ORDER BY id"):
+            users[username] = {"password": password, "created_at": created_at, "history": []}
+            ids[user_id] = username
+        for user_id, *row in self.conn.execute(
+                "SELECT user_id, date, correct, total, categories, answers FROM history ORDER BY id"):
+            users[ids[user_id]]["history"].append(self._history_entry(row))
+        return users
+
+    def get_user(self, username):
+        row = self.conn.execute(
+            "SELECT password, created_at FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"password": row[0], "created_at": row[1]}
+
+    def get_history(self, username):
+        rows = self.conn.execute(
+            "SELECT h.date, h.correct, h.total, h.categories, h.answers FROM history h "
+            "JOIN users u ON u.id = h.user_id WHERE u.username = ? ORDER BY h.id",
+            (username,)
+        )
+        return [self._history_entry(row) for row in rows]
+
+    def iter_history(self, username):
+        rows = self.conn.execute(
+            "SELECT h.date, h.correct, h.total, h.categories, h.answers FROM history h "
+            "JOIN users u ON u.id = h.user_id WHERE u.username = ? ORDER BY h.id",
+            (username,)
+        )
+        return (self._history_entry(row) for row in rows)
+
+    def usernames(self):
+        return [username for username, in self.conn.execute("SELECT username FROM users ORDER BY id")]
+
+    def get_history_page(self, username, offset, limit):
+        rows = self.conn.execute(
+            "SELECT h.date, h.correct, h.total, h.categories, h.answers FROM history h "
+            "JOIN users u ON u.id = h.user_id WHERE u.username = ? ORDER BY h.id DESC LIMIT ? OFFSET ?",
+            (username, limit, offset)
+        )
+        return [self._history_entry(row) for row in rows]
+
+    def create_user(self, username, password_hash, created_at):
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                    (username, password_hash, created_at)
+                )
+        except sqlite3.IntegrityError:
+            raise UserExistsError(f"User {username} already exists") from None
+
+    def delete_user(self, username):
+        with self.conn:
+            self.conn.execute("DELETE FROM users WHERE username = ?", (username,))
+
+    def append_history(self, username, entry):
+        row = self.conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return
+        user_id = row[0]
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO history (user_id, date, correct, total, categories, answers) VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, *self._history_row(entry))
+            )
+            self._add_stats(user_id, 1, entry["correct"], entry["total"], [
+                (cat["category"], cat["correct"], cat["total"]) for cat in entry["categories"]
+            ])
+
+    def _add_stats(self, user_id, quizzes, correct, total, categories):
+        self.conn.execute(
+            "INSERT INTO user_stats (user_id, quizzes, correct, total) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET quizzes = quizzes + excluded.quizzes, "
+            "correct = correct + excluded.correct, total = total + excluded.total",
+            (user_id, quizzes, correct, total)
+        )
+        self.conn.executemany(
+            "INSERT INTO category_stats (user_id, category, correct, total) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id, category) DO UPDATE SET "
+            "correct = correct + excluded.correct, total = total + excluded.total",
+            [(user_id, category, cat_correct, cat_total) for category, cat_correct, cat_total in categories]
+        )
+
+    def get_stats(self, username):
+        stats = empty_stats()
+        row = self.conn.execute(
+            "SELECT s.quizzes, s.correct, s.total FROM user_stats s "
+            "JOIN users u ON u.id = s.user_id WHERE u.username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return stats
+        stats["quizzes"], stats["correct"], stats["total"] = row
+        for category, correct, total in self.conn.execute(
+                "SELECT c.category, c.correct, c.total FROM category_stats c "
+                "JOIN users u ON u.id = c.user_id WHERE u.username = ? ORDER BY c.id", (username,)):
+            stats["categories"][category] = [correct, total]
+        return stats
+
+    def rebuild_stats(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM user_stats")
+            self.conn.execute("DELETE FROM category_stats")
+            user_id = None
+            stats = None
+            for row_user_id, *row in self.conn.execute(
+                    "SELECT user_id, date, correct, total, categories, answers FROM history ORDER BY user_id, id").fetchall():
+                if row_user_id != user_id:
+                    if user_id is not None:
+                        self._insert_stats(user_id, stats)
+                    user_id, stats = row_user_id, empty_stats()
+                add_to_stats(stats, self._history_entry(row))
+            if user_id is not None:
+                self._insert_stats(user_id, stats)
+
+    def _insert_stats(self, user_id, stats):
+        self._add_stats(user_id, stats["quizzes"], stats["correct"], stats["total"], [
+            (category, correct, total) for category, (correct, total) in stats["categories"].items()
+        ])
+
+    def set_password_hash(self, username, password_hash):
+        with self.conn:
+            self.conn.execute("UPDATE users SET password = ? WHERE username = ?", (password_hash, username))
+
+    def get_mastery(self, username):
+        mastery = {}
+        for category, question, *state in self.conn.execute(
+                "SELECT m.category, m.question, m.box, m.due, m.seen, m.correct FROM mastery m "
+                "JOIN users u ON u.id = m.user_id WHERE u.username = ?", (username,)):
+            mastery.setdefault(category, {})[question] = tuple(state)
+        return mastery
+
+    def update_mastery(self, username, changes):
+        row = self.conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO mastery (user_id, category, question, box, due, seen, correct) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(row[0], category, index, *state) for category, rows in changes.items() for index, state in rows.items()]
+            )
+
+    def signature(self):
+        return file_signature(self.path, self.path + "-wal")
+
+    def close(self):
+        self.conn.close()
+
+def mastery_from_json(data):
+    """Convert a mastery table stored in JSON (string indices, lists) to the layout of get_mastery()."""
+    return {category: {int(index): tuple(state) for index, state in rows.items()} for category, rows in data.items()}
+
+def merge_mastery_json(data, changes):
+    """Write mastery states into a table stored in JSON."""
+    for category, rows in changes.items():
+        target = data.setdefault(category, {})
+        for index, state in rows.items():
+            target[str(index)] = list(state)
+
+def apply_journal_event(users, event):
+    """
+    Apply one journal event to an in-memory users dictionary (same layout as users.json).
+    """
+    op = event["op"]
+    username = event["user"]
+    if op == "create":
+        if username in users:
+            # Lost signup race in a journal written before creates were checked: the first one stands
+            return
+        users[username] = {
+            "password": event["password"],
+            "created_at": event["created_at"],
+            "history": [],
+            "stats": empty_stats()
+        }
+    elif op == "delete":
+        users.pop(username, None)
+    elif op == "history":
+        if username in users:
+            entry = upgrade_entry(event["entry"])
+            users[username]["history"].append(entry)
+            add_to_stats(users[username]["stats"], entry)
+    elif op == "password":
+        if username in users:
+            users[username]["password"] = event["password"]
+    elif op == "mastery":
+        if username in users:
+            merge_mastery_json(users[username].setdefault("mastery", {}), event["changes"])
+    else:
+        raise ValueError(f"Unknown journal event: {op}")
+
+class JournalUserStore(UserStore):
+    """
+    Append-only backend: changes are appended as JSON lines to a journal and the full user base
+    is only rewritten when the journal is compacted into the snapshot.
+    The in-memory state is the snapshot plus the replayed journal tail, and it catches up with
+    lines appended by other processes before every read.
+    """
+    def __init__(self, snapshot_path=USERS_SNAPSHOT, journal_path=USERS_JOURNAL,
+                 fsync_batch=8, fsync_interval=1.0, compact_threshold=1000):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.lock_path = journal_path + ".lock"
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+
+        self.unsynced = 0
+        self.last_fsync = time.monotonic()
+        self.fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+
+        with self._locked(exclusive=True):
+            if not os.path.exists(snapshot_path):
+                # Seed the snapshot from the legacy user file on first use
+                self._write_snapshot(JsonUserStore().load_all())
+            self._reload()
+        if self.tail_events >= compact_threshold:
+            self.compact()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            fsync_batch=config["journal_fsync_batch"],
+            fsync_interval=config["journal_fsync_interval"],
+            compact_threshold=config["journal_compact_threshold"]
+        )
+
+    def _locked(self, exclusive):
+        return FileLock(self.lock_path, exclusive)
+
+    def _snapshot_id(self):
+        st = os.stat(self.snapshot_path)
+        return st.st_ino, st.st_mtime_ns
+
+    def _write_snapshot(self, users):
+        atomic_write_json(self.snapshot_path, users)
+
+    def _reload(self):
+        """Rebuild the in-memory state from the snapshot and the whole journal. Caller holds the lock."""
+        with span(f"read {self.snapshot_path}", "io"), open(self.snapshot_path, 'r') as f:
+            self.users = json.load(f)
+        for data in self.users.values():
+            upgrade_history(data["history"])
+            if "stats" not in data:
+                data["stats"] = stats_from_history(data["history"])
+        self.snapshot_id = self._snapshot_id()
+        self.offset = 0
+        self.tail_events = 0
+        self._replay_tail()
+
+    def _replay_tail(self):
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        # A line is only complete once its newline has been written
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                apply_journal_event(self.users, json.loads(line))
+                self.tail_events += 1
+        self.offset += end
+
+    def _catch_up(self):
+        """Pick up events appended by other processes, or reload after another process compacted."""
+        if self._snapshot_id() != self.snapshot_id or os.path.getsize(self.journal_path) < self.offset:
+            self._reload()
+        else:
+            self._replay_tail()
+
+    def _append(self, event):
+        line = (json.dumps(event) + "\n").encode()
+        with self._locked(exclusive=True):
+            self._catch_up()
+            if event["op"] == "create" and event["user"] in self.users:
+                raise UserExistsError(f"User {event['user']} already exists")
+            os.write(self.fd, line)
+            apply_journal_event(self.users, event)
+            self.offset += len(line)
+            self.tail_events += 1
+
+        self.unsynced += 1
+        now = time.monotonic()
+        if self.unsynced >= self.fsync_batch or now - self.last_fsync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flush the appended journal lines to disk."""
+        if self.unsynced:
+            os.fsync(self.fd)
+            self.unsynced = 0
+        self.last_fsync = time.monotonic()
+
+    def compact(self):
+        """
+        Fold the journal into a new snapshot and start an empty journal.
+        """
+        with self._locked(exclusive=True):
+            self._catch_up()
+            self._write_snapshot(self.users)
+            os.ftruncate(self.fd, 0)
+            os.fsync(self.fd)
+            self.snapshot_id = self._snapshot_id()
+            self.offset = 0
+            self.tail_events = 0
+            self.unsynced = 0
+
+    def _read(self):
+        with self._locked(exclusive=False):
+            self._catch_up()
+        return self.users
+
+    def load_all(self):
+        return {
+            username: dict(data, history=list(data["history"]))
+            for username, data in self._read().items()
+        }
+
+    def get_user(self, username):
+        data = self._read().get(username)
+        return {"password": data["password"], "created_at": data["created_at"]} if data else None
+
+    def get_history(self, username):
+        data = self._read().get(username)
+        return list(data["history"]) if data else []
+
+    def usernames(self):
+        return list(self._read())
+
+    def get_history_page(self, username, offset, limit):
+        data = self._read().get(username)
+        if not data:
+            return []
+        history = data["history"]
+        end = len(history) - offset
+        return history[max(0, end - limit):max(0, end)][::-1]
+
+    def create_user(self, username, password_hash, created_at):
+        self._append({"op": "create", "user": username, "password": password_hash, "created_at": created_at})
+
+    def delete_user(self, username):
+        self._append({"op": "delete", "user": username})
+
+    def append_history(self, username, entry):
+        self._append({"op": "history", "user": username, "entry": entry})
+
+    def set_password_hash(self, username, password_hash):
+        self._append({"op": "password", "user": username, "password": password_hash})
+
+    def update_mastery(self, username, changes):
+        self._append({"op": "mastery", "user": username, "changes": changes})
+
+    def get_mastery(self, username):
+        data = self._read().get(username)
+        return mastery_from_json(data.get("mastery", {})) if data else {}
+
+    def get_stats(self, username):
+        data = self._read().get(username)
+        return copy_stats(data["stats"]) if data else empty_stats()
+
+    def rebuild_stats(self):
+        with self._locked(exclusive=True):
+            self._catch_up()
+            for data in self.users.values():
+                data["stats"] = stats_from_history(data["history"])
+        self.compact()
+
+    def signature(self):
+        return file_signature(self.snapshot_path, self.journal_path)
+
+    def close(self):
+        self.sync()
+        os.close(self.fd)
+
+STORE_BACKENDS = {
+    "sqlite": SqliteUserStore,
+    "json": JsonUserStore,
+    "journal": JournalUserStore,
+}
+
+def migrate_json_to_sqlite(json_path=USERS_JSON, db_path=USERS_DB, force=False):
+    """
+    Copy every user, history entry and mastery table from the legacy users.json file into the SQLite store.
+    Refuses to run against a database that already holds users unless force is set.
+    Returns the number of migrated users.
+    """
+    users = JsonUserStore(json_path).load_all()
+    store = SqliteUserStore(db_path)
+    try:
+        existing = store.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        if existing and not force:
+            raise ValueError(f"{db_path} already contains {existing} users")
+
+        with store.conn:
+            for username, data in users.items():
+                store.conn.execute("DELETE FROM users WHERE username = ?", (username,))
+                cursor = store.conn.execute(
+                    "INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                    (username, data["password"], data.get("created_at", ""))
+                )
+                store.conn.executemany(
+                    "INSERT INTO history (user_id, date, correct, total, categories, answers) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (cursor.lastrowid, *store._history_row(entry))
+                        for entry in data.get("history", [])
+                    ]
+                )
+                store.conn.executemany(
+                    "INSERT INTO mastery (user_id, category, question, box, due, seen, correct) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (cursor.lastrowid, category, index, *state)
+                        for category, rows in mastery_from_json(data.get("mastery", {})).items()
+                        for index, state in rows.items()
+                    ]
+                )
+        store.rebuild_stats()
+    finally:
+        store.close()
+    return len(users)
+
+def open_user_store(config=None):
+    """
+    Open the user store selected by the "user_store" setting.
+    The first time the SQLite store is opened, existing users are migrated from users.json.
+    """
+    config = config or load_config()
+    backend = config["user_store"]
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown user store backend: {backend}")
+
+    if backend == "sqlite" and not os.path.exists(USERS_DB) and os.path.exists(USERS_JSON):
+        with FileLock(USERS_DB + ".lock"):
+            # Checked again in case another process migrated while we waited for the lock
+            if not os.path.exists(USERS_DB):
+                # Migrate next to the target and rename, so an interrupted migration is retried on the next start
+                migrate_json_to_sqlite(db_path=USERS_DB + ".tmp", force=True)
+                os.replace(USERS_DB + ".tmp", USERS_DB)
+    return STORE_BACKENDS[backend].from_config(config)
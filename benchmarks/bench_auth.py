@@ -0,0 +1,65 @@
+"""
+Login latency against user stores of growing size.
+
+Run from the project root:
+    python3 -m benchmarks.bench_auth
+
+Every account shares one low-cost bcrypt hash so the timings are dominated by the user
+lookup; with keyed lookup the latency stays flat from 10 to 100k users.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import bcrypt
+
+from backend.user_management import verify_and_rehash
+from backend.user_repository import UserRepository
+from backend.user_store import SqliteUserStore
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+LOGINS = 200
+PASSWORD = "secret"
+ROUNDS = 4
+
+def build_store(path, size, password_hash):
+    store = SqliteUserStore(path)
+    with store.conn:
+        store.conn.executemany(
+            "INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)",
+            ((f"user{i}", password_hash, "2025-01-01 00:00") for i in range(size))
+        )
+    return store
+
+def time_logins(store, size, rng):
+    timings = []
+    for _ in range(LOGINS):
+        username = f"user{rng.randrange(size)}"
+        # A fresh repository per login, so every lookup goes to the store
+        users = UserRepository(store)
+        start = time.perf_counter()
+        # What check_user_login does: lookup on the calling thread, then the bcrypt verify
+        user = users.get_user(username)
+        valid, _ = verify_and_rehash(PASSWORD, user["password"] if user else None, ROUNDS)
+        timings.append(time.perf_counter() - start)
+        assert valid
+    return timings
+
+def main():
+    rng = random.Random(42)
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=ROUNDS)).decode()
+
+    print(f"{'users':>8} {'median ms':>10} {'p95 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            store = build_store(os.path.join(tmp, f"users_{size}.db"), size, password_hash)
+            timings = sorted(time_logins(store, size, rng))
+            store.close()
+            median = statistics.median(timings) * 1000
+            p95 = timings[int(len(timings) * 0.95)] * 1000
+            print(f"{size:>8} {median:>10.3f} {p95:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Item analysis (cli.py analyze) over a large synthetic answer log.
+
+Run from the project root:
+    python3 -m benchmarks.bench_item_analysis [--answers 20000000] [--questions 5000] [--workers N]
+
+The log is generated with NumPy in a throwaway folder: students of random ability take quizzes
+of QUIZ_SIZE questions of random difficulty, and a few questions get a wrong key, which the
+analysis should flag with a negative discrimination.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from backend.answer_log import HEADER, MAGIC, RECORD, RECORD_FIELDS, VERSION
+from backend.item_analysis import analyze
+
+QUIZ_SIZE = 7
+OPTIONS = 4
+BROKEN_KEYS = 10
+BATCH = 2_000_000
+
+def write_log(path, answers, questions, seed):
+    rng = np.random.default_rng(seed)
+    difficulty = rng.normal(0, 1, questions)
+    keys = rng.integers(0, OPTIONS, questions)
+    # Wrongly keyed questions: strong students pick the real answer and are marked wrong
+    broken = rng.choice(questions, BROKEN_KEYS, replace=False)
+    flipped = np.zeros(questions, dtype=bool)
+    flipped[broken] = True
+    ids = np.unique(rng.integers(0, 2**64, questions * 2, dtype=np.uint64))[:questions]
+    rng.shuffle(ids)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        quiz_base = 0
+        for start in range(0, answers, BATCH):
+            n = min(BATCH, answers - start) // QUIZ_SIZE * QUIZ_SIZE
+            quizzes = n // QUIZ_SIZE
+            records = np.zeros(n, dtype=np.dtype(RECORD_FIELDS))
+            ability = np.repeat(rng.normal(0, 1, quizzes), QUIZ_SIZE)
+            question = rng.integers(0, questions, n)
+            knows = rng.random(n) < 1 / (1 + np.exp(difficulty[question] - ability))
+            correct = np.where(flipped[question], ~knows & (rng.random(n) < 0.3), knows)
+            wrong_choice = (keys[question] + rng.integers(1, OPTIONS, n)) % OPTIONS
+            choice = np.where(correct, keys[question], wrong_choice)
+            choice[rng.random(n) < 0.02] = -1
+
+            records["quiz"] = quiz_base + np.repeat(np.arange(quizzes, dtype=np.uint64), QUIZ_SIZE)
+            records["user"] = rng.integers(0, 2**32, n, dtype=np.uint32)
+            records["question"] = ids[question]
+            records["time"] = 1_700_000_000
+            records["seconds"] = rng.uniform(2, 30, n)
+            records["choice"] = choice
+            records["correct"] = correct & (choice >= 0)
+            records["options"] = OPTIONS
+            records.tofile(f)
+            quiz_base += quizzes
+    return set(ids[broken].tolist())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--answers", type=int, default=20_000_000)
+    parser.add_argument("--questions", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "answers.bin")
+        start = time.perf_counter()
+        broken = write_log(path, args.answers, args.questions, args.seed)
+        size = os.path.getsize(path)
+        print(f"generated {size // RECORD.size} answers ({size / 2**20:.0f} MB) in {time.perf_counter() - start:.1f} s")
+
+        for workers in sorted({1, args.workers or os.cpu_count() or 1}):
+            start = time.perf_counter()
+            result = analyze(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"{workers} worker(s): {elapsed:.2f} s ({result['records'] / elapsed / 1e6:.1f} M answers/s)")
+
+    negative = set(result["question"][result["discrimination"] < 0].tolist())
+    print(f"wrongly keyed questions flagged: {len(broken & negative)} of {len(broken)}; "
+          f"other questions with negative discrimination: {len(negative - broken)}")
+
+if __name__ == "__main__":
+    main()
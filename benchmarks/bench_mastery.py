@@ -0,0 +1,99 @@
+"""
+Adaptive question selection (MasteryIndex) on a large bank, against rescanning the mastery table
+for every quiz, as the user's table grows.
+
+Run from the project root:
+    python3 -m benchmarks.bench_mastery [--questions 100000] [--categories 10] [--quizzes 200]
+
+No user store is needed: the table is generated as if the user had already answered the given
+share of the bank, and each simulated quiz records its answers (70% right) a few hours later.
+"""
+import argparse
+import random
+import time
+
+from backend.mastery import INTERVALS, MasteryIndex, next_state
+
+QUIZ_SIZE = 20
+RIGHT_RATE = 0.7
+QUIZ_INTERVAL = 6 * 3600  # simulated seconds between two quizzes
+
+def make_table(categories, per_category, seen_share, now, rng):
+    rows = {}
+    for category in categories:
+        category_rows = rows[category] = {}
+        for index in rng.sample(range(per_category), int(per_category * seen_share)):
+            box = rng.randrange(len(INTERVALS))
+            category_rows[index] = (box, now + rng.uniform(-1, 1) * INTERVALS[-1], rng.randint(1, 5), rng.randint(0, 5))
+    return rows
+
+def rescan_pick(rows, count, category, k, now, rng):
+    # Sort the whole table of the category by due date, then fill up with random unseen questions
+    category_rows = rows.get(category, {})
+    ordered = sorted(category_rows, key=lambda index: category_rows[index][1])
+    picked = [index for index in ordered[:k] if category_rows[index][1] <= now]
+    while len(picked) < k and len(category_rows) + len(picked) < count:
+        index = rng.randrange(count)
+        if index not in category_rows and index not in picked:
+            picked.append(index)
+    for index in ordered:
+        if len(picked) >= k:
+            break
+        if index not in picked:
+            picked.append(index)
+    return picked
+
+def simulate(pick, record, categories, quizzes, now, rng):
+    per_category = QUIZ_SIZE // len(categories) or 1
+    start = time.perf_counter()
+    for _ in range(quizzes):
+        answers = []
+        for category in categories:
+            for index in pick(category, per_category, now):
+                answers.append((category, index, 0, rng.random() < RIGHT_RATE, 1.0))
+        record(answers, now)
+        now += QUIZ_INTERVAL
+    return (time.perf_counter() - start) / quizzes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--quizzes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    categories = [f"Category {c}" for c in range(args.categories)]
+    per_category = args.questions // args.categories
+    # Quizzes draw from a few categories, as a student picks them on the category screen
+    quiz_categories = categories[:3]
+    now = time.time()
+
+    print(f"{args.questions} questions in {args.categories} categories, {QUIZ_SIZE} questions per quiz")
+    print(f"{'seen':>6} {'rows':>8} {'build ms':>9} {'index us/quiz':>14} {'rescan us/quiz':>15}")
+    for seen_share in (0.0, 0.1, 0.5, 1.0):
+        rng = random.Random(args.seed)
+        rows = make_table(categories, per_category, seen_share, now, rng)
+        table_size = sum(len(r) for r in rows.values())
+        index = MasteryIndex("bench", rows, lambda category: per_category, seed=args.seed)
+
+        # The first pick of a category builds its heap from the table (once per login)
+        start = time.perf_counter()
+        for category in quiz_categories:
+            index.pick(category, 0, now)
+        build_ms = (time.perf_counter() - start) * 1000
+        indexed = simulate(index.pick, index.record, quiz_categories, args.quizzes, now, rng)
+
+        rows = make_table(categories, per_category, seen_share, now, random.Random(args.seed))
+
+        def record(answers, when):
+            for category, question, _, correct, _ in answers:
+                rows[category][question] = next_state(rows[category].get(question), correct, when)
+
+        rescan = simulate(lambda category, k, when: rescan_pick(rows, per_category, category, k, when, rng),
+                          record, quiz_categories, max(1, args.quizzes // 20), now, rng)
+        print(f"{seen_share:>6.0%} {table_size:>8} {build_ms:>9.1f} "
+              f"{indexed * 1e6:>14.1f} {rescan * 1e6:>15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Memory used by a 100k-question bank and a quiz drawn from it, as plain dicts versus Question objects.
+
+Run from the project root:
+    python3 -m benchmarks.bench_question_memory
+"""
+import gc
+import random
+import tracemalloc
+
+from backend.question import Question
+
+QUESTIONS = 100_000
+CATEGORY_SIZE = 1_000
+COMMON_OPTIONS = ["True", "False", "None of these", "All of the above", "O(1)", "O(n)", "O(log n)", "O(n^2)"]
+
+def records(rng):
+    # Bank records as decoded from JSON: unique question text, a mix of shared and unique options
+    for i in range(QUESTIONS):
+        options = [f"Option {i}-{k}" for k in range(2)] + rng.sample(COMMON_OPTIONS, 2)
+        rng.shuffle(options)
+        yield f"Category {i // CATEGORY_SIZE}", {
+            "question": f"Synthetic question number {i}?",
+            "options": options,
+            "correct": str(rng.randint(1, 4))
+        }
+
+def as_dicts(rng):
+    bank = {}
+    for category, record in records(rng):
+        bank.setdefault(category, []).append(record)
+    return bank
+
+def as_questions(rng):
+    bank = {}
+    for category, record in records(rng):
+        items = bank.setdefault(category, [])
+        items.append(Question.from_record(record, category, len(items)))
+    return bank
+
+def shuffle_dicts(bank, rng):
+    # What prepare_quiz used to build for every asked question
+    quiz = []
+    for category, items in bank.items():
+        for q in items:
+            pairs = list(enumerate(q["options"]))
+            rng.shuffle(pairs)
+            indices, options = zip(*pairs)
+            quiz.append({
+                "question": q["question"],
+                "options": list(options),
+                "correct": str(indices.index(int(q["correct"]) - 1) + 1),
+                "category": category
+            })
+    return quiz
+
+def shuffle_questions(bank, rng):
+    quiz = []
+    for items in bank.values():
+        for q in items:
+            order = list(range(len(q.options)))
+            rng.shuffle(order)
+            quiz.append(q.shuffled(order))
+    return quiz
+
+def measure(build, *args):
+    gc.collect()
+    tracemalloc.start()
+    result = build(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def main():
+    print(f"{QUESTIONS} questions")
+    print(f"{'representation':<16} {'bank MB':>8} {'shuffled MB':>12}")
+    for name, build, shuffle in (("dict", as_dicts, shuffle_dicts), ("Question", as_questions, shuffle_questions)):
+        bank, bank_size = measure(build, random.Random(1))
+        tracemalloc.start()
+        quiz = shuffle(bank, random.Random(2))
+        gc.collect()
+        quiz_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:<16} {bank_size / 2**20:>8.1f} {quiz_size / 2**20:>12.1f}")
+        del bank, quiz
+
+if __name__ == "__main__":
+    main()
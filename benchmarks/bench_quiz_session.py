@@ -0,0 +1,117 @@
+"""
+Simulated answers per second through QuizSession, against the score bookkeeping it replaced,
+and the cost of pausing and resuming a quiz with to_dict()/from_dict().
+
+Run from the project root:
+    python3 -m benchmarks.bench_quiz_session [--answers 1000000] [--categories 50]
+
+No window is needed: quizzes are drawn from a synthetic bank and answered at random.
+"""
+import argparse
+import json
+import random
+import time
+
+from backend.question import Question
+from backend.quiz_session import QuizSession
+
+QUIZ_SIZE = 20
+OPTIONS = 4
+
+class SyntheticBank:
+    """Just enough of QuestionBank for QuizSession.from_dict()."""
+    def __init__(self, categories, per_category):
+        self.questions = {
+            f"Category {c}": [
+                Question(f"Question {c}-{i}?", [f"Option {k}" for k in range(OPTIONS)], i % OPTIONS, f"Category {c}", i)
+                for i in range(per_category)
+            ]
+            for c in range(categories)
+        }
+
+    def load(self, category):
+        return self.questions[category]
+
+def draw_quizzes(bank, count, rng):
+    categories = list(bank.questions)
+    quizzes = []
+    for _ in range(count):
+        questions = []
+        for _ in range(QUIZ_SIZE):
+            order = list(range(OPTIONS))
+            rng.shuffle(order)
+            questions.append(rng.choice(bank.questions[rng.choice(categories)]).shuffled(order))
+        quizzes.append(questions)
+    return quizzes
+
+def run_sessions(categories, quizzes, choices):
+    answered = 0
+    for questions, picks in zip(quizzes, choices):
+        quiz = QuizSession(categories, questions)
+        for choice in picks:
+            quiz.answer(choice)
+            quiz.advance()
+        answered += len(picks)
+        quiz.score
+    return answered
+
+def run_tuples(categories, quizzes, choices):
+    # What prepare_quiz() and check_answer() used to do: a linear search of the score tuples per answer
+    answered = 0
+    for questions, picks in zip(quizzes, choices):
+        score = [(category, 0, 0) for category in categories]
+        answers = []
+        for question, choice in zip(questions, picks):
+            for i, (cat, current_score, num_questions) in enumerate(score):
+                if cat == question.category:
+                    score[i] = (cat, current_score, num_questions + 1)
+                    break
+            correct = choice == question.correct
+            answers.append((question.category, question.index, question.original_option(choice), correct, 0.0))
+            if correct:
+                for i, (cat, current_score, num_questions) in enumerate(score):
+                    if cat == question.category:
+                        score[i] = (cat, current_score + 1, num_questions)
+                        break
+        answered += len(picks)
+    return answered
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    bank = SyntheticBank(args.categories, 100)
+    categories = list(bank.questions)
+    # Distinct quizzes are cycled so drawing them does not dominate the setup
+    pool = draw_quizzes(bank, 1000, rng)
+    count = max(1, args.answers // QUIZ_SIZE)
+    quizzes = [pool[i % len(pool)] for i in range(count)]
+    choices = [[rng.randrange(OPTIONS) for _ in range(QUIZ_SIZE)] for _ in range(len(pool))]
+    choices = [choices[i % len(choices)] for i in range(count)]
+
+    print(f"{count * QUIZ_SIZE} answers, {args.categories} categories, {QUIZ_SIZE} questions per quiz")
+    for name, run in (("score tuples", run_tuples), ("QuizSession", run_sessions)):
+        start = time.perf_counter()
+        answered = run(categories, quizzes, choices)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14} {answered / elapsed / 1e6:6.2f} M answers/s")
+
+    # Pause half-way through a quiz, through JSON as a client or file would store it
+    quiz = QuizSession(categories, pool[0])
+    for choice in choices[0][:QUIZ_SIZE // 2]:
+        quiz.answer(choice)
+        quiz.advance()
+    rounds = 10_000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        resumed = QuizSession.from_dict(json.loads(json.dumps(quiz.to_dict())), bank)
+    elapsed = time.perf_counter() - start
+    assert resumed.score == quiz.score and resumed.current == quiz.current
+    print(f"pause/resume   {elapsed / rounds * 1e6:6.1f} us per quiz (to_dict, JSON round trip, from_dict)")
+
+if __name__ == "__main__":
+    main()
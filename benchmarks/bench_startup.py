@@ -0,0 +1,77 @@
+"""
+Startup cost of the GUI: import time of gui.front, measured with python -X importtime, and,
+when a display is available, the time until the start screen has been drawn.
+
+Run from the project root:
+    python3 -m benchmarks.bench_startup
+
+Each measurement runs in a fresh interpreter and the median of RUNS is reported. The exit
+status is 1 when a median is over its budget, so the script can guard against regressions.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+IMPORT_BUDGET_MS = 150
+WINDOW_BUDGET_MS = 400
+TOP_MODULES = 10
+
+WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+from gui.front import MCQApp
+app = MCQApp()
+app.update()
+print((time.perf_counter() - start) * 1000)
+app.destroy()
+"""
+
+def import_times():
+    """Return {module: (self_us, cumulative_us)} for one import of gui.front in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import gui.front"],
+        capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def window_time():
+    """Return the milliseconds from the first import to the drawn start screen, in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    runs = [import_times() for _ in range(RUNS)]
+    totals = [times["gui.front"][1] / 1000 for times in runs]
+    import_ms = statistics.median(totals)
+
+    print(f"Slowest modules (self time, median of {RUNS} runs):")
+    modules = {name: statistics.median(times[name][0] for times in runs if name in times) for name in runs[0]}
+    for name, self_us in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:TOP_MODULES]:
+        print(f"  {self_us / 1000:8.2f} ms  {name}")
+    for heavy in ("numpy", "bcrypt"):
+        if heavy in runs[0]:
+            print(f"  warning: {heavy} is imported at startup")
+
+    over_budget = False
+    print(f"\nimport gui.front: {import_ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    over_budget |= import_ms > IMPORT_BUDGET_MS
+
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        window_ms = statistics.median(window_time() for _ in range(RUNS))
+        print(f"start screen drawn: {window_ms:.1f} ms (budget {WINDOW_BUDGET_MS} ms)")
+        over_budget |= window_ms > WINDOW_BUDGET_MS
+    else:
+        print("start screen drawn: skipped, no display")
+
+    return 1 if over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
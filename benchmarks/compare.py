@@ -0,0 +1,70 @@
+"""
+Compare two result files of benchmarks.run, e.g. from the commit before and after a change.
+
+Run from the project root:
+    python3 -m benchmarks.compare OLD.json NEW.json [--threshold 0.2]
+
+For each case the p50, p95, throughput and peak RSS are shown with their relative change.
+The exit status is 1 when a case got slower (p50 or p95) or bigger by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+# (result key, label, True when a higher value is worse)
+METRICS = [
+    ("p50_ms", "p50 ms", True),
+    ("p95_ms", "p95 ms", True),
+    ("ops_per_s", "ops/s", False),
+    ("peak_rss_mb", "RSS MB", True),
+]
+# Throughput is shown but not checked: it follows p50/mean and would report the same regression twice
+CHECKED = {"p50_ms", "p95_ms", "peak_rss_mb"}
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def change(old, new):
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    old, new = load(args.old), load(args.new)
+    print(f"old: {old.get('commit') or '?'}  {old['date']}  {old['params']}")
+    print(f"new: {new.get('commit') or '?'}  {new['date']}  {new['params']}")
+    if old["params"] != new["params"]:
+        print("warning: the runs used different parameters")
+
+    regressions = []
+    print(f"{'case':<22} {'metric':<8} {'old':>10} {'new':>10} {'change':>8}")
+    for name in new["results"]:
+        if name not in old["results"]:
+            continue
+        before, after = old["results"][name], new["results"][name]
+        for key, label, higher_is_worse in METRICS:
+            delta = change(before.get(key), after.get(key))
+            if delta is None:
+                continue
+            worse = delta > args.threshold if higher_is_worse else delta < -args.threshold
+            flag = ""
+            if worse and key in CHECKED:
+                regressions.append(f"{name} {label}")
+                flag = "  <-- regression"
+            print(f"{name:<22} {label:<8} {before[key]:>10.2f} {after[key]:>10.2f} {delta:>+8.1%}{flag}")
+
+    if regressions:
+        print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
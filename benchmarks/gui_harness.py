@@ -0,0 +1,271 @@
+"""
+Render latency of the app's screens, driven by a script under a virtual display.
+
+Run from the project root (Linux; needs Xvfb unless a display is already available):
+    python3 -m benchmarks.gui_harness [--rounds 3] [--budget-scale 1.0] [--output FILE]
+
+A throwaway data folder is used (low bcrypt cost, no time limits). The script signs up a user,
+then for each round logs in, picks categories, answers a whole quiz (some answers wrong, to go
+through the "wrong" screen), opens the history and logs out; it ends by logging in once more and
+deleting the account from the welcome screen's dialog. Each transition is timed from the
+action (the button's command) until Tk has processed the resulting events and redrawn, and the
+number of Tk widgets is counted after it. A transition over its budget makes the exit status 1;
+widget counts that grow from one round to the next are reported as a leak.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCREEN = "1024x768x24"
+USERNAME = "harness"
+PASSWORD = "secret"
+QUIZ_CATEGORIES = 2
+WRONG_ANSWER_RATE = 0.3
+SETTLE_TIMEOUT = 10.0  # s to wait for a transition that finishes in the background (login)
+
+# Budgets in ms. A screen's first appearance includes building its widgets; later ones only refresh them.
+STARTUP_BUDGET_MS = 1500
+FIRST_BUILD_BUDGET_MS = 500
+TRANSITION_BUDGET_MS = 100
+# The login check runs bcrypt on the auth executor, whose result is polled every AuthExecutor.POLL_INTERVAL
+LOGIN_BUDGET_MS = 300
+
+def start_xvfb():
+    """Start Xvfb on a free display and point DISPLAY at it; returns the process."""
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise RuntimeError("No display available and Xvfb is not installed (e.g. apt install xvfb)")
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(
+        [xvfb, "-displayfd", str(write_fd), "-screen", "0", SCREEN, "-nolisten", "tcp"],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    os.close(write_fd)
+    # Xvfb writes the display number it picked once it accepts connections
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        process.kill()
+        raise RuntimeError("Xvfb did not start")
+    os.environ["DISPLAY"] = f":{display}"
+    return process
+
+def make_data_folder(folder):
+    os.makedirs(os.path.join(folder, "data"))
+    shutil.copy(os.path.join(ROOT, "data", "questions.json"), os.path.join(folder, "data"))
+    with open(os.path.join(folder, "data", "config.json"), "w") as f:
+        json.dump({"bcrypt_rounds": 4, "question_time": 0, "exam_time": 0}, f)
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+class Harness:
+    def __init__(self, app, budget_scale):
+        self.app = app
+        self.budget_scale = budget_scale
+        self.built = set(app.frame_cache)
+        self.round = 0
+        self.records = []
+
+    def settle(self, done):
+        deadline = time.perf_counter() + SETTLE_TIMEOUT
+        self.app.update()
+        while not done():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("The app did not reach the expected screen")
+            time.sleep(0.001)
+            self.app.update()
+
+    def transition(self, action, target, budget_ms=TRANSITION_BUDGET_MS):
+        """Run action, wait until the target screen is shown and painted, and record the time taken."""
+        app = self.app
+        source = next((name for name, frame in app.frame_cache.items() if frame is app.current_frame), "?")
+        first = target not in self.built
+        start = time.perf_counter()
+        action()
+        self.settle(lambda: app.current_frame is app.frame_cache.get(target))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.built.add(target)
+        if first:
+            budget_ms = max(budget_ms, FIRST_BUILD_BUDGET_MS)
+        self.records.append({
+            "round": self.round,
+            "transition": f"{source} -> {target}" + (" (first)" if first else ""),
+            "ms": elapsed_ms,
+            "budget_ms": budget_ms * self.budget_scale,
+            "widgets": count_widgets(app),
+        })
+
+    def navigate(self, target, budget_ms=TRANSITION_BUDGET_MS):
+        # What the plain navigation buttons do
+        self.transition(lambda: self.app.show_frame(target), target, budget_ms)
+
+    def fill(self, frame, **values):
+        # The screens clear their entries in on_show()
+        for name, value in values.items():
+            getattr(frame, name).insert(0, value)
+
+    def sign_up(self):
+        self.navigate("signup")
+        frame = self.app.frame_cache["signup"]
+        self.fill(frame, username_entry=USERNAME, password_entry=PASSWORD, confirm_password_entry=PASSWORD)
+        self.transition(frame.signup_button.invoke, "welcome", LOGIN_BUDGET_MS)
+        self.navigate("start")
+
+    def take_quiz(self, rng):
+        app = self.app
+        self.navigate("login")
+        frame = app.frame_cache["login"]
+        self.fill(frame, username_entry=USERNAME, password_entry=PASSWORD)
+        self.transition(frame.login_button.invoke, "welcome", LOGIN_BUDGET_MS)
+
+        self.navigate("categories")
+        categories = app.frame_cache["categories"]
+        for name in rng.sample(sorted(categories.category_vars), QUIZ_CATEGORIES):
+            categories.category_vars[name].set(True)
+        self.transition(lambda: categories.start_quiz(app), "quiz")
+
+        while True:
+            quiz = app.frame_cache["quiz"]
+            question = app.quiz.question
+            wrong = rng.random() < WRONG_ANSWER_RATE
+            choice = (question.correct + 1) % len(question.options) if wrong else question.correct
+            quiz.answer_var.set(str(choice))
+            last = app.quiz.current == len(app.quiz.questions) - 1
+            if wrong:
+                self.transition(quiz.check_answer, "wrong")
+                self.transition(app.frame_cache["wrong"].next_question, "score" if last else "quiz")
+            else:
+                self.transition(quiz.check_answer, "score" if last else "quiz")
+            if last:
+                break
+
+        self.navigate("history")
+        self.navigate("welcome")
+        self.navigate("start")
+
+    def delete_account(self):
+        import customtkinter as ctk
+
+        app = self.app
+        self.navigate("login")
+        frame = app.frame_cache["login"]
+        self.fill(frame, username_entry=USERNAME, password_entry=PASSWORD)
+        self.transition(frame.login_button.invoke, "welcome", LOGIN_BUDGET_MS)
+
+        welcome = app.frame_cache["welcome"]
+        welcome.confirm_delete_account()
+        dialog = [w for w in welcome.winfo_children() if isinstance(w, ctk.CTkToplevel)][-1]
+        app.update()
+        password_entry, confirm_entry = [w for w in dialog.winfo_children() if isinstance(w, ctk.CTkEntry)]
+        password_entry.insert(0, PASSWORD)
+        confirm_entry.insert(0, PASSWORD)
+        button_frame = [w for w in dialog.winfo_children() if isinstance(w, ctk.CTkFrame)][-1]
+        delete_button = [w for w in button_frame.winfo_children() if isinstance(w, ctk.CTkButton)][0]
+        self.transition(delete_button.invoke, "start", LOGIN_BUDGET_MS)
+        if app.users.get_user(USERNAME) is not None:
+            raise RuntimeError("The account was not deleted")
+
+    def failures(self):
+        return [r for r in self.records if r["ms"] > r["budget_ms"]]
+
+    def leaks(self):
+        """Transitions whose widget count grew between rounds (a screen that keeps adding widgets)."""
+        first_seen = {}
+        grown = {}
+        for r in self.records:
+            if r["round"] == 0:
+                continue
+            name = r["transition"]
+            first_seen.setdefault(name, r["widgets"])
+            if r["widgets"] > first_seen[name]:
+                grown[name] = (first_seen[name], r["widgets"])
+        return grown
+
+def print_report(records):
+    groups = {}
+    for r in records:
+        groups.setdefault(r["transition"], []).append(r)
+    print(f"{'transition':<34} {'n':>4} {'p50 ms':>8} {'max ms':>8} {'budget':>8} {'widgets':>8}")
+    for name, rows in groups.items():
+        times = sorted(r["ms"] for r in rows)
+        print(f"{name:<34} {len(rows):>4} {statistics.median(times):>8.1f} {times[-1]:>8.1f} "
+              f"{rows[0]['budget_ms']:>8.0f} {rows[-1]['widgets']:>8}")
+
+def run(rounds, budget_scale, seed):
+    from gui.front import MCQApp
+
+    start = time.perf_counter()
+    app = MCQApp()
+    app.update()
+    startup_ms = (time.perf_counter() - start) * 1000
+    harness = Harness(app, budget_scale)
+    harness.records.append({
+        "round": 0, "transition": "startup", "ms": startup_ms,
+        "budget_ms": STARTUP_BUDGET_MS * budget_scale, "widgets": count_widgets(app),
+    })
+    try:
+        rng = random.Random(seed)
+        harness.sign_up()
+        for round_number in range(1, rounds + 1):
+            harness.round = round_number
+            harness.take_quiz(rng)
+        harness.round = rounds + 1
+        harness.delete_account()
+    finally:
+        app.destroy()
+    return harness
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiplier of every budget, for slow machines")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also save the measurements to this JSON file")
+    args = parser.parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+
+    xvfb = None
+    cwd = os.getcwd()
+    try:
+        if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+            xvfb = start_xvfb()
+        with tempfile.TemporaryDirectory() as folder:
+            make_data_folder(folder)
+            # The app reads and writes data/ relative to the working directory
+            os.chdir(folder)
+            try:
+                harness = run(args.rounds, args.budget_scale, args.seed)
+            finally:
+                os.chdir(cwd)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+
+    print_report(harness.records)
+    if output:
+        with open(output, "w") as f:
+            json.dump({"rounds": args.rounds, "records": harness.records}, f, indent=2)
+
+    status = 0
+    for r in harness.failures():
+        print(f"over budget: round {r['round']} {r['transition']} took {r['ms']:.1f} ms (budget {r['budget_ms']:.0f} ms)")
+        status = 1
+    for name, (before, after) in harness.leaks().items():
+        print(f"widget count grows: {name} went from {before} to {after} widgets")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Load test of the quiz server (cli.py serve) with simulated students.
+
+Run from the project root:
+    python3 -m benchmarks.load_quiz_server [--students 2000] [--connections 200] [--adaptive]
+
+A server is started in a throwaway data folder (low bcrypt cost, no time limit) unless --url
+points at a running one. Every student signs up, then all of them take a quiz at the same time:
+each connection serves its share of the students round-robin, one answer at a time, so every
+session stays open until the end. Latency percentiles are reported per endpoint.
+With --adaptive the quizzes pick their questions from each student's mastery table.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Client:
+    """One keep-alive HTTP connection to the server."""
+    def __init__(self, host, port, timings):
+        self.host = host
+        self.port = port
+        self.timings = timings
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def post(self, path, payload):
+        body = json.dumps(payload).encode()
+        start = time.perf_counter()
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        response = json.loads(await self.reader.readexactly(length))
+        self.timings.setdefault(path, []).append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"{path} returned {status}: {response.get('error')}")
+        return response
+
+    def close(self):
+        self.writer.close()
+
+async def sign_up(client, names):
+    sessions = []
+    for name in names:
+        response = await client.post("/signup", {"username": name, "password": "secret"})
+        sessions.append([response["session"], response["categories"]])
+    return sessions
+
+async def take_quizzes(client, sessions, rng, adaptive):
+    # Start every quiz first, then answer one question per student in turn
+    pending = []
+    for session, categories in sessions:
+        chosen = rng.sample(categories, rng.randint(1, len(categories)))
+        response = await client.post("/quiz", {"session": session, "categories": chosen, "adaptive": adaptive})
+        pending.append((session, response["question"]))
+    answered = 0
+    while pending:
+        still_running = []
+        for session, question in pending:
+            choice = rng.randrange(len(question["options"]))
+            response = await client.post("/answer", {"session": session, "choice": choice})
+            answered += 1
+            if "question" in response:
+                still_running.append((session, response["question"]))
+        pending = still_running
+    return answered
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def report(timings, elapsed, phase):
+    requests = sum(len(values) for values in timings.values())
+    print(f"{phase}: {requests} requests in {elapsed:.2f} s ({requests / elapsed:.0f} req/s)")
+    for path, values in sorted(timings.items()):
+        values.sort()
+        print(f"  {path:8} n={len(values):6}  p50={percentile(values, 0.5) * 1000:7.2f} ms  "
+              f"p95={percentile(values, 0.95) * 1000:7.2f} ms  p99={percentile(values, 0.99) * 1000:7.2f} ms  "
+              f"mean={statistics.fmean(values) * 1000:7.2f} ms")
+
+async def run(host, port, students, connections, seed, adaptive=False):
+    rng = random.Random(seed)
+    prefix = f"student{rng.randrange(10**9)}-"
+    names = [f"{prefix}{i}" for i in range(students)]
+    shares = [names[i::connections] for i in range(connections)]
+
+    timings = {}
+    clients = [Client(host, port, timings) for _ in shares]
+    await asyncio.gather(*(client.connect() for client in clients))
+    try:
+        start = time.perf_counter()
+        sessions = await asyncio.gather(*(sign_up(client, share) for client, share in zip(clients, shares)))
+        report(timings, time.perf_counter() - start, "signup")
+
+        timings.clear()
+        start = time.perf_counter()
+        answered = await asyncio.gather(*(
+            take_quizzes(client, share, random.Random(rng.random()), adaptive)
+            for client, share in zip(clients, sessions)
+        ))
+        report(timings, time.perf_counter() - start, f"quiz ({students} concurrent sessions, {sum(answered)} answers)")
+    finally:
+        for client in clients:
+            client.close()
+
+def start_server(folder):
+    os.makedirs(os.path.join(folder, "data"))
+    shutil.copy(os.path.join(ROOT, "data", "questions.json"), os.path.join(folder, "data"))
+    with open(os.path.join(folder, "data", "config.json"), "w") as f:
+        json.dump({"bcrypt_rounds": 4, "question_time": 0}, f)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "cli.py"), "serve", "--port", "0"],
+        cwd=folder, stdout=subprocess.PIPE, text=True,
+        env=dict(os.environ, PYTHONPATH=ROOT)
+    )
+    line = process.stdout.readline()  # "Serving quizzes on ('127.0.0.1', 12345)"
+    if not line.startswith("Serving"):
+        process.kill()
+        raise RuntimeError("The quiz server did not start")
+    port = int(line.rsplit(",", 1)[1].strip(" )\n"))
+    return process, port
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="address of a running server, e.g. http://127.0.0.1:8080")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--adaptive", action="store_true", help="take adaptive quizzes")
+    args = parser.parse_args(argv)
+    connections = max(1, min(args.connections, args.students))
+
+    if args.url:
+        address = urlsplit(args.url)
+        asyncio.run(run(address.hostname, address.port or 80, args.students, connections, args.seed, args.adaptive))
+        return 0
+
+    with tempfile.TemporaryDirectory() as folder:
+        process, port = start_server(folder)
+        try:
+            asyncio.run(run("127.0.0.1", port, args.students, connections, args.seed, args.adaptive))
+        finally:
+            process.terminate()
+            process.wait()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Benchmark suite for the backend hot paths on synthetic data.
+
+Run from the project root:
+    python3 -m benchmarks.run [--scale small|medium|large] [--backend sqlite|json|journal] [--output FILE]
+
+A seeded question bank and user store (see benchmarks.synthetic) are generated in a throwaway
+folder, then each case runs in a fresh process so its peak RSS is its own. Throughput, latency
+percentiles and peak RSS are printed and saved as JSON (by default under benchmarks/results/,
+named after the current commit) for benchmarks.compare.
+
+check_user_login needs a login form, so its case times the work behind it: the user lookup and
+the bcrypt verify_and_rehash() it runs on the auth executor. Passwords use the lowest bcrypt cost.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+from benchmarks import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+RESULTS_VERSION = 1
+WARMUP = 3  # untimed iterations first, so lazy imports and cold caches are not counted
+
+SCALES = {
+    "small": {"questions": 1_000, "categories": 10, "users": 100, "history": 200},
+    "medium": {"questions": 100_000, "categories": 50, "users": 10_000, "history": 100},
+    "large": {"questions": 1_000_000, "categories": 100, "users": 1_000_000, "history": 20},
+}
+
+def open_app():
+    """The parts of the app window the backend functions use, over the data in the current folder."""
+    from backend.config import load_config
+    from backend.question_bank import open_question_bank
+    from backend.user_repository import UserRepository
+    from backend.user_store import open_user_store
+    settings = load_config()
+    return SimpleNamespace(
+        settings=settings,
+        question_bank=open_question_bank(),
+        users=UserRepository(open_user_store(settings)),
+        selected_categories=[],
+        current_user=None,
+        adaptive=False,
+        quiz=None,
+        mastery=None
+    )
+
+# Each case is set up outside the timings and returns the step timed on every iteration
+
+def case_load_questions(app, rng, params):
+    import backend.question_management as qm
+    return lambda: qm.load_questions()
+
+def case_prepare_quiz(app, rng, params):
+    import backend.question_management as qm
+    categories = app.question_bank.categories()
+
+    def step():
+        app.selected_categories = rng.sample(categories, min(len(categories), rng.randint(1, 3)))
+        qm.prepare_quiz(app)
+    return step
+
+def case_prepare_adaptive_quiz(app, rng, params):
+    import backend.question_management as qm
+    from backend.mastery import mastery_index
+    categories = app.question_bank.categories()
+    app.current_user = f"user{rng.randrange(params['users'])}"
+    app.adaptive = True
+    mastery_index(app)  # built from the user's history once per login
+
+    def step():
+        app.selected_categories = rng.sample(categories, min(len(categories), rng.randint(1, 3)))
+        qm.prepare_quiz(app)
+    return step
+
+def case_save_score(app, rng, params):
+    import backend.question_management as qm
+    import backend.user_management as um
+    app.selected_categories = app.question_bank.categories()[:2]
+    qm.prepare_quiz(app)
+    while not app.quiz.finished:
+        app.quiz.answer(rng.randrange(len(app.quiz.question.options)), rng.uniform(2, 30))
+        app.quiz.advance()
+
+    def step():
+        app.current_user = f"user{rng.randrange(params['users'])}"
+        um.save_score(app)
+    return step
+
+def case_check_user_login(app, rng, params):
+    import backend.user_management as um
+    rounds = app.settings["bcrypt_rounds"]
+
+    def step():
+        username = f"user{rng.randrange(params['users'])}"
+        user = app.users.get_user(username)
+        valid, new_hash = um.verify_and_rehash(synthetic.PASSWORD, user["password"] if user else None, rounds)
+        assert valid
+        if new_hash:
+            app.users.set_password_hash(username, new_hash)
+    return step
+
+def case_calculate_user_stats(app, rng, params):
+    import backend.score_evaluation as se
+    return lambda: se.calculate_user_stats(app.users, f"user{rng.randrange(params['users'])}")
+
+def case_export_csv(app, rng, params):
+    import backend.user_management as um
+
+    def step():
+        done, message = um.export_csv(app.users, f"user{rng.randrange(params['users'])}", "export.csv")
+        assert done, message
+    return step
+
+# name -> (setup, iterations)
+CASES = {
+    "load_questions": (case_load_questions, 20),
+    "prepare_quiz": (case_prepare_quiz, 1000),
+    "prepare_adaptive_quiz": (case_prepare_adaptive_quiz, 1000),
+    "save_score": (case_save_score, 100),
+    "check_user_login": (case_check_user_login, 200),
+    "calculate_user_stats": (case_calculate_user_stats, 1000),
+    "export_csv": (case_export_csv, 50),
+}
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where the resource module is missing (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+def run_case(folder, name, iterations, params):
+    """Run one case in the data folder; returns its timings in seconds and the peak RSS."""
+    os.chdir(folder)
+    setup, _ = CASES[name]
+    app = open_app()
+    try:
+        step = setup(app, random.Random(params["seed"]), params)
+        for _ in range(WARMUP):
+            step()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            step()
+            timings.append(time.perf_counter() - start)
+    finally:
+        app.users.close()
+        app.question_bank.close()
+    return timings, peak_rss_mb()
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def summarize(timings, rss):
+    values = sorted(timings)
+    total = sum(values)
+    return {
+        "iterations": len(values),
+        "total_s": total,
+        "ops_per_s": len(values) / total if total else None,
+        "mean_ms": statistics.fmean(values) * 1000,
+        "p50_ms": percentile(values, 0.5) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": values[-1] * 1000,
+        "peak_rss_mb": rss,
+    }
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def print_results(results):
+    print(f"{'case':<22} {'n':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak RSS MB':>12}")
+    for name, r in results.items():
+        rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "-"
+        print(f"{name:<22} {r['iterations']:>6} {r['ops_per_s']:>10.1f} {r['p50_ms']:>9.3f} "
+              f"{r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {rss:>12}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--questions", type=int, help="override the question count of the scale")
+    parser.add_argument("--users", type=int, help="override the user count of the scale")
+    parser.add_argument("--history", type=int, help="override the quizzes per user of the scale")
+    parser.add_argument("--backend", choices=["sqlite", "json", "journal"], default="sqlite")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--iterations", type=float, default=1.0, help="multiplier of every case's iterations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file for the results (default: benchmarks/results/<commit>-<scale>-<backend>.json)")
+    args = parser.parse_args(argv)
+
+    params = dict(SCALES[args.scale], seed=args.seed, backend=args.backend)
+    for key in ("questions", "users", "history"):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    commit = git_commit()
+    output = os.path.abspath(args.output or os.path.join(
+        RESULTS_DIR, f"{(commit or 'unknown')[:10]}-{args.scale}-{args.backend}.json"
+    ))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        synthetic.generate(folder, params["questions"], params["categories"], params["users"],
+                           params["history"], args.backend, args.seed)
+        print(f"{args.scale} ({params['questions']} questions, {params['users']} users with {params['history']} "
+              f"quizzes each, {args.backend} store) generated in {time.perf_counter() - start:.1f} s")
+
+        # Spawned rather than forked, so the peak RSS of a case does not include the generator's
+        context = multiprocessing.get_context("spawn")
+        for name in args.cases:
+            iterations = max(1, round(CASES[name][1] * args.iterations))
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                timings, rss = pool.submit(run_case, folder, name, iterations, params).result()
+            results[name] = summarize(timings, rss)
+    print_results(results)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Many processes saving quiz results to one user store at the same time.
+
+Run from the project root:
+    python3 -m benchmarks.stress_save_scores [--backend json|journal|sqlite] [--processes 32] [--saves 20]
+
+Every process appends its results to its own user and to one shared user, in a throwaway data
+folder. Afterwards the store must hold every entry; the exit status is 1 if any was lost.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.history import make_entry
+from backend.user_store import JournalUserStore, JsonUserStore, SqliteUserStore
+
+SHARED_USER = "shared"
+
+def open_store(backend, folder):
+    if backend == "json":
+        return JsonUserStore(os.path.join(folder, "users.json"))
+    if backend == "journal":
+        return JournalUserStore(
+            os.path.join(folder, "users.snapshot.json"),
+            os.path.join(folder, "users.journal.jsonl"),
+            compact_threshold=200
+        )
+    return SqliteUserStore(os.path.join(folder, "users.db"))
+
+def save_scores(backend, folder, worker, saves):
+    store = open_store(backend, folder)
+    try:
+        username = f"user{worker}"
+        store.create_user(username, "hash", "2025-01-01 00:00")
+        for i in range(saves):
+            entry = make_entry(f"{worker}-{i}", [("Python", i % 3, 3)], [("Python", 0, 0, True, 1.0)])
+            store.append_history(username, entry)
+            store.append_history(SHARED_USER, entry)
+    finally:
+        store.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite"], default="json")
+    parser.add_argument("--processes", type=int, default=32)
+    parser.add_argument("--saves", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        store = open_store(args.backend, folder)
+        store.create_user(SHARED_USER, "hash", "2025-01-01 00:00")
+        store.close()
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(args.processes) as pool:
+            futures = [
+                pool.submit(save_scores, args.backend, folder, worker, args.saves)
+                for worker in range(args.processes)
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        store = open_store(args.backend, folder)
+        try:
+            lost = 0
+            for worker in range(args.processes):
+                lost += args.saves - len(store.get_history(f"user{worker}"))
+            shared = store.get_history(SHARED_USER)
+            lost += args.processes * args.saves - len(shared)
+            stats = store.get_stats(SHARED_USER)
+        finally:
+            store.close()
+
+    writes = 2 * args.processes * args.saves
+    print(f"{args.backend}: {writes} saves from {args.processes} processes in {elapsed:.2f} s "
+          f"({writes / elapsed:.0f} saves/s)")
+    print(f"lost entries: {lost}; shared user stats count {stats['quizzes']} quizzes")
+    return 1 if lost or stats["quizzes"] != len(shared) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
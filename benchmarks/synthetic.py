@@ -0,0 +1,151 @@
+"""
+Seeded synthetic data for the benchmarks: question banks and user stores of any size.
+
+The same arguments always produce the same data. Files are written with the layout the app
+reads, into a data/ folder under the given root, so a benchmark can chdir there and use the
+regular code paths. Users and histories are streamed, so stores of millions of users do not
+have to fit in memory while they are generated.
+
+    python3 -m benchmarks.synthetic FOLDER --questions 100000 --users 10000 --history 100
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from backend.history import add_to_stats, empty_stats, make_entry
+from backend.user_store import SqliteUserStore
+
+OPTIONS = 4
+QUIZ_SIZE = 7
+COMMON_OPTIONS = ["True", "False", "None of these", "All of the above", "O(1)", "O(n)", "O(log n)", "O(n^2)"]
+FIRST_DATE = datetime(2024, 1, 1)
+PASSWORD = "secret"
+BCRYPT_ROUNDS = 4
+
+def category_names(categories):
+    return [f"Category {c}" for c in range(categories)]
+
+def question_bank(questions, categories, seed=0):
+    """Return a bank in the layout of questions.json: questions spread evenly over the categories."""
+    rng = random.Random(seed)
+    names = category_names(categories)
+    bank = {name: [] for name in names}
+    for i in range(questions):
+        options = [f"Option {i}-{k}" for k in range(OPTIONS - 2)] + rng.sample(COMMON_OPTIONS, 2)
+        rng.shuffle(options)
+        bank[names[i % categories]].append({
+            "question": f"Synthetic question number {i}?",
+            "options": options,
+            "correct": str(rng.randint(1, OPTIONS))
+        })
+    return bank
+
+def write_question_bank(root, questions, categories, seed=0):
+    """Write data/questions.json under root; returns the category sizes."""
+    bank = question_bank(questions, categories, seed)
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    with open(os.path.join(root, "data", "questions.json"), "w") as f:
+        json.dump(bank, f, separators=(",", ":"))
+    return {name: len(items) for name, items in bank.items()}
+
+def history_entries(rng, sizes, count):
+    """Yield count history entries of QUIZ_SIZE questions from one to three categories, oldest first."""
+    names = list(sizes)
+    for n in range(count):
+        chosen = rng.sample(names, min(len(names), rng.randint(1, 3)))
+        score = {category: [0, 0] for category in chosen}
+        answers = []
+        for q in range(QUIZ_SIZE):
+            category = chosen[q % len(chosen)]
+            correct = rng.random() < 0.7
+            choice = rng.randrange(OPTIONS) if correct or rng.random() < 0.9 else -1  # -1: timed out
+            score[category][0] += correct
+            score[category][1] += 1
+            answers.append((category, rng.randrange(sizes[category]), choice, correct, rng.uniform(2, 30)))
+        date = (FIRST_DATE + timedelta(hours=n)).strftime("%Y-%m-%d %H:%M")
+        yield make_entry(date, [(category, c, t) for category, (c, t) in score.items()], answers)
+
+def users(sizes, count, history, password_hash, seed=0):
+    """Yield (username, password hash, created_at, history entries) for users user0..user{count-1}."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield f"user{i}", password_hash, "2024-01-01 00:00", history_entries(rng, sizes, history)
+
+def _write_users_file(path, generated):
+    # Streamed by hand: one user at a time, in the layout of JsonUserStore
+    with open(path, "w") as f:
+        f.write("{")
+        for i, (username, password_hash, created_at, entries) in enumerate(generated):
+            history = list(entries)
+            stats = empty_stats()
+            for entry in history:
+                add_to_stats(stats, entry)
+            user = {"password": password_hash, "created_at": created_at, "history": history, "stats": stats}
+            f.write(("," if i else "") + json.dumps(username) + ":" + json.dumps(user, separators=(",", ":")))
+        f.write("}")
+
+def _write_sqlite(path, generated):
+    store = SqliteUserStore(path)
+    try:
+        with store.conn:
+            for username, password_hash, created_at, entries in generated:
+                cursor = store.conn.execute(
+                    "INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                    (username, password_hash, created_at)
+                )
+                store.conn.executemany(
+                    "INSERT INTO history (user_id, date, correct, total, categories, answers) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((cursor.lastrowid, *store._history_row(entry)) for entry in entries)
+                )
+        store.rebuild_stats()
+    finally:
+        store.close()
+
+def write_user_store(root, backend, sizes, count, history, password_hash, seed=0):
+    """Write a user store for the given backend ("sqlite", "json" or "journal") under root/data."""
+    data = os.path.join(root, "data")
+    os.makedirs(data, exist_ok=True)
+    generated = users(sizes, count, history, password_hash, seed)
+    if backend == "sqlite":
+        _write_sqlite(os.path.join(data, "users.db"), generated)
+    elif backend == "json":
+        _write_users_file(os.path.join(data, "users.json"), generated)
+    elif backend == "journal":
+        # The journal store starts from its snapshot, which has the same layout as users.json
+        _write_users_file(os.path.join(data, "users.snapshot.json"), generated)
+        open(os.path.join(data, "users.journal.jsonl"), "w").close()
+    else:
+        raise ValueError(f"Unknown user store backend: {backend}")
+
+def generate(root, questions, categories, user_count, history, backend="sqlite", seed=0):
+    """
+    Write a question bank, a user store and a config.json selecting that store under root/data.
+    Every user's password is PASSWORD, hashed at the lowest bcrypt cost so logins stay cheap.
+    """
+    import bcrypt
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+    sizes = write_question_bank(root, questions, categories, seed)
+    write_user_store(root, backend, sizes, user_count, history, password_hash, seed)
+    with open(os.path.join(root, "data", "config.json"), "w") as f:
+        json.dump({"user_store": backend, "bcrypt_rounds": BCRYPT_ROUNDS}, f)
+    return sizes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder")
+    parser.add_argument("--questions", type=int, default=1_000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--history", type=int, default=50)
+    parser.add_argument("--backend", choices=["sqlite", "json", "journal"], default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generate(args.folder, args.questions, args.categories, args.users, args.history, args.backend, args.seed)
+    print(f"Wrote {args.questions} questions and {args.users} users ({args.history} quizzes each) "
+          f"to {os.path.join(args.folder, 'data')}; every password is {PASSWORD!r}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import csv
+import os
+import sys
+import time
+
+import backend.answer_log as al
+import backend.exam_generator as eg
+import backend.export as ex
+import backend.item_analysis as ia
+import backend.question_bank as qb
+import backend.quiz_server as server
+import backend.user_management as um
+import backend.user_store as us
+from backend.auth_executor import AuthExecutor
+from backend.config import load_config, save_config
+
+def cmd_migrate(args):
+    """Copy the legacy users.json file into the SQLite user store."""
+    try:
+        count = us.migrate_json_to_sqlite(args.source, args.db, force=args.force)
+    except us.STORE_ERRORS as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Migrated {count} users from {args.source} to {args.db}")
+    return 0
+
+def cmd_compact(args):
+    """Fold the history journal into a fresh snapshot."""
+    store = us.JournalUserStore.from_config(load_config())
+    try:
+        events = store.tail_events
+        store.compact()
+    finally:
+        store.close()
+    print(f"Compacted {events} journal events into {store.snapshot_path}")
+    return 0
+
+def cmd_verify(args):
+    """Check (and optionally rehash) many username/password pairs in parallel."""
+    with open(args.credentials, newline="") as f:
+        credentials = [(row[0], row[1]) for row in csv.reader(f) if len(row) >= 2]
+
+    store = us.open_user_store()
+    executor = AuthExecutor(args.workers)
+    try:
+        hashes = []
+        for username, _ in credentials:
+            user = store.get_user(username)
+            hashes.append(user["password"] if user else None)
+
+        passwords = [password for _, password in credentials]
+        rounds = load_config()["bcrypt_rounds"]
+        results = list(executor.map(um.verify_password, passwords, hashes, [rounds] * len(passwords)))
+        failed = [username for (username, _), valid in zip(credentials, results) if not valid]
+        verified = [(username, password) for (username, password), valid in zip(credentials, results) if valid]
+
+        if args.rehash:
+            new_hashes = executor.map(um.hash_password, [password for _, password in verified], [rounds] * len(verified))
+            for (username, _), new_hash in zip(verified, new_hashes):
+                store.set_password_hash(username, new_hash)
+    finally:
+        executor.shutdown()
+        store.close()
+
+    for username in failed:
+        print(f"FAILED {username}")
+    print(f"{len(verified)} verified{' and rehashed' if args.rehash else ''}, {len(failed)} failed")
+    return 1 if failed else 0
+
+def cmd_calibrate(args):
+    """Pick the bcrypt cost that meets a target verify latency on this machine."""
+    rounds = um.calibrate_rounds(args.target_ms)
+    print(f"bcrypt cost {rounds} verifies within {args.target_ms} ms on this machine")
+    if args.save:
+        save_config({"bcrypt_rounds": rounds})
+        print("Saved to data/config.json; existing passwords are rehashed at their next login")
+    return 0
+
+def cmd_compile_questions(args):
+    """Compile the JSON question bank into the indexed binary format."""
+    count = qb.compile_questions(args.source, args.output)
+    print(f"Compiled {count} categories from {args.source} into {args.output}")
+    return 0
+
+def cmd_generate(args):
+    """Write randomized exam papers with answer keys as JSON lines."""
+    config = load_config()
+    size = args.size or config["quiz_size"]
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        count = eg.generate_papers(
+            out, args.count, args.categories, size, config["category_weights"], args.seed, args.workers
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        if out is not sys.stdout:
+            out.close()
+            os.remove(args.output)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Generated {count} papers of up to {size} questions", file=sys.stderr)
+    return 0
+
+def cmd_rebuild_stats(args):
+    """Recompute the per-user statistics aggregates from the full histories."""
+    store = us.open_user_store()
+    try:
+        store.rebuild_stats()
+    finally:
+        store.close()
+    print("Rebuilt user statistics")
+    return 0
+
+def cmd_analyze(args):
+    """Per-question difficulty, discrimination and choice rates from the answer log."""
+    start = time.perf_counter()
+    try:
+        result = ia.analyze(args.log, workers=args.workers)
+    except FileNotFoundError:
+        print(f"No answer log at {args.log}: no quiz has been taken with the answer_log setting on", file=sys.stderr)
+        return 1
+    except (RuntimeError, ValueError) as e:
+        print(f"Analysis failed: {e}", file=sys.stderr)
+        return 1
+    if result is None:
+        print("The answer log is empty")
+        return 0
+    elapsed = time.perf_counter() - start
+    print(f"Analyzed {result['records']} answers from {result['quizzes']} quizzes to "
+          f"{len(result['question'])} questions in {elapsed:.2f} s")
+
+    bank = qb.open_question_bank()
+    try:
+        labels = ia.question_labels(bank)
+    finally:
+        bank.close()
+    header = ia.report_header(result)
+    rows = list(ia.report_rows(result, labels))
+    flagged = [row for row in rows if row[-1] and row[-1] != "few answers"]
+    print(f"{len(flagged)} questions flagged (difficulty, discrimination, category: question):")
+    for row in flagged[:args.top]:
+        print(f"  {row[5]:>6} {row[6] or '-':>6}  [{row[-1]}] {row[1]}: {row[3]}")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        print(f"Report of {len(rows)} questions written to {args.output}")
+    return 0
+
+def cmd_export(args):
+    """Export quiz histories: one user as CSV, or every user as CSV or Parquet."""
+    try:
+        if args.user:
+            store = us.open_user_store()
+            try:
+                if store.get_user(args.user) is None:
+                    print(f"Unknown user {args.user}", file=sys.stderr)
+                    return 1
+                count = ex.export_user_csv(store, args.user, args.output, compress=args.gzip)
+            finally:
+                store.close()
+        else:
+            count = ex.export_all(args.output, args.format, compress=args.gzip, workers=args.workers)
+    except (RuntimeError, *us.STORE_ERRORS) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {count} rows to {args.output}")
+    return 0
+
+def cmd_serve(args):
+    """Serve quizzes over HTTP to many students at once."""
+    server.run_server(args.host, args.port)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Maintenance commands for the MCQ Quiz App (no GUI required).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="migrate users.json into the SQLite user store")
+    migrate.add_argument("--source", default=us.USERS_JSON, help="legacy JSON user file")
+    migrate.add_argument("--db", default=us.USERS_DB, help="target SQLite database")
+    migrate.add_argument("--force", action="store_true", help="overwrite users already present in the database")
+    migrate.set_defaults(func=cmd_migrate)
+
+    compact = commands.add_parser("compact", help="fold the journal of the journal user store into its snapshot")
+    compact.set_defaults(func=cmd_compact)
+
+    verify = commands.add_parser("verify", help="verify username,password pairs from a CSV file in parallel")
+    verify.add_argument("credentials", help="CSV file with one username,password pair per line")
+    verify.add_argument("--rehash", action="store_true", help="store a fresh hash for every verified account")
+    verify.add_argument("--workers", type=int, default=None, help="number of worker threads (default: one per core)")
+    verify.set_defaults(func=cmd_verify)
+
+    calibrate = commands.add_parser("calibrate", help="choose the bcrypt cost for a target verify latency")
+    calibrate.add_argument("--target-ms", type=float, default=250, help="maximum time for one password check")
+    calibrate.add_argument("--save", action="store_true", help="store the chosen cost in data/config.json")
+    calibrate.set_defaults(func=cmd_calibrate)
+
+    compile_questions = commands.add_parser("compile-questions", help="compile the question bank for fast loading")
+    compile_questions.add_argument("--source", default=qb.QUESTIONS_JSON, help="JSON question bank")
+    compile_questions.add_argument("--output", default=qb.QUESTIONS_BIN, help="compiled question bank")
+    compile_questions.set_defaults(func=cmd_compile_questions)
+
+    generate = commands.add_parser("generate", help="generate randomized exam papers with answer keys")
+    generate.add_argument("count", type=int, help="number of papers")
+    generate.add_argument("-o", "--output", default="-", help="JSON-lines output file (default: standard output)")
+    generate.add_argument("-c", "--categories", nargs="+", help="categories to draw from (default: all)")
+    generate.add_argument("--size", type=int, help="questions per paper (default: quiz_size setting)")
+    generate.add_argument("--seed", type=int, help="seed for reproducible papers")
+    generate.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    generate.set_defaults(func=cmd_generate)
+
+    export = commands.add_parser("export", help="export quiz histories of one or all users")
+    export.add_argument("output", help="output file (a .gz name implies --gzip)")
+    export.add_argument("--user", help="export only this user, in the same CSV layout as the app (default: all users)")
+    export.add_argument("--format", choices=ex.FORMATS, default="csv", help="all-users output format (parquet needs pyarrow)")
+    export.add_argument("--gzip", action="store_true", help="gzip-compress CSV output")
+    export.add_argument("--workers", type=int, default=1, help="worker processes for the all-users export")
+    export.set_defaults(func=cmd_export)
+
+    serve = commands.add_parser("serve", help="serve quizzes to many students over a local HTTP JSON API")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for the whole lab network)")
+    serve.add_argument("--port", type=int, default=8080, help="port to listen on")
+    serve.set_defaults(func=cmd_serve)
+
+    analyze = commands.add_parser("analyze", help="per-question item analysis of every answer in the answer log")
+    analyze.add_argument("--log", default=al.ANSWER_LOG, help="answer log to analyze")
+    analyze.add_argument("-o", "--output", help="CSV file for the full per-question report")
+    analyze.add_argument("--top", type=int, default=20, help="flagged questions to print")
+    analyze.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    analyze.set_defaults(func=cmd_analyze)
+
+    rebuild_stats = commands.add_parser("rebuild-stats", help="recompute per-user statistics from the quiz histories")
+    rebuild_stats.set_defaults(func=cmd_rebuild_stats)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
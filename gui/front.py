@@ -1,12 +1,21 @@
-import json
-import bcrypt
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import customtkinter as ctk
 import backend.question_management as qm
 import backend.score_evaluation as se
 import backend.user_management as um
-from customtkinter import filedialog
+from backend import tracing
+from backend.auth_executor import AuthExecutor
+from backend.config import load_config
+from backend.question_bank import open_question_bank
+from backend.user_repository import UserRepository
+from backend.user_store import open_user_store
+from gui.timer import TimerScheduler
 from datetime import datetime
 
+PRELOAD_DELAY = 100  # ms after startup before the user store is opened, so the start screen is painted first
+
 class MCQApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -17,14 +26,26 @@ class MCQApp(ctk.CTk):
 
         # Initialize instance variables
         self.current_user = None
-        self.score = 0
-        self.current_question = 0
         self.selected_categories = []
-        self.questions = []
+        self.quiz = None  # QuizSession of the quiz being taken
 
         um.ensure_data_directory()
-
-        self.all_questions = qm.load_questions()
+        self.settings = load_config()
+        self.adaptive = self.settings["quiz_mode"] == "adaptive"
+        self.mastery = None  # MasteryIndex of the logged-in user, built by their first quiz
+
+        self.auth = AuthExecutor()
+        self.timers = TimerScheduler(self)
+        self.exam_timer = None
+
+        # The question bank is opened (and recompiled if needed) in the background while the start
+        # screen is shown. The user store is opened on the Tk thread, which its connection belongs to,
+        # once the window is up or when it is first needed.
+        loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="load")
+        self.question_bank_future = loader.submit(open_question_bank)
+        loader.shutdown(wait=False)
+        self._users = None
+        self.after(PRELOAD_DELAY, lambda: self.users)
 
         self.frames = {
             "start": StartFrame,
@@ -38,18 +59,72 @@ class MCQApp(ctk.CTk):
             "score": ScoreFrame
         }
 
+        self.frame_cache = {}
         self.current_frame = None
         self.show_frame("start")
 
-    def show_frame(self, frame_name):
-        if self.current_frame:
-            self.current_frame.destroy()
+    @property
+    def users(self):
+        """The user repository, opened on first use."""
+        if self._users is None:
+            self._users = UserRepository(open_user_store(self.settings))
+        return self._users
 
-        Frame = self.frames[frame_name]
-        self.current_frame = Frame(self)
-        self.current_frame.pack(fill="both", expand=True)
+    @property
+    def question_bank(self):
+        """The question bank, waiting for the background load if it has not finished yet."""
+        return self.question_bank_future.result()
 
-class StartFrame(ctk.CTkFrame):
+    def show_frame(self, frame_name):
+        """
+        Show a screen. Screens are built the first time they are shown and kept afterwards:
+        the one being left gets on_hide() and the one being shown on_show(), which refreshes its data.
+        """
+        with tracing.span("show_frame", "gui", frame=frame_name):
+            frame = self.frame_cache.get(frame_name)
+            if frame is None:
+                frame_class = self.frames[frame_name]
+                with tracing.span(f"{frame_class.__name__}.__init__", "gui"):
+                    frame = self.frame_cache[frame_name] = frame_class(self)
+
+            if self.current_frame:
+                self.current_frame.shown = False
+                self.current_frame.on_hide()
+                if self.current_frame is not frame:
+                    self.current_frame.pack_forget()
+
+            self.current_frame = frame
+            frame.shown = True
+            frame.on_show()
+            if not frame.winfo_manager():
+                frame.pack(fill="both", expand=True)
+
+    def stop_exam_timer(self):
+        self.timers.cancel(self.exam_timer)
+        self.exam_timer = None
+
+def clear_entry(entry):
+    # Deleting while the placeholder is displayed would make the entry forget its "show" option
+    if entry.get():
+        entry.delete(0, "end")
+
+class AppFrame(ctk.CTkFrame):
+    """
+    Base class of the app's screens.
+    Widgets are built once in __init__; on_show() fills in the data of the current user and quiz
+    every time the screen is shown, and on_hide() stops whatever must not run while it is hidden.
+    """
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.shown = False
+
+    def on_show(self):
+        pass
+
+    def on_hide(self):
+        pass
+
+class StartFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
 
@@ -89,7 +164,7 @@ class StartFrame(ctk.CTkFrame):
             font=("Arial", 16, "bold")
         ).pack(pady=10)
 
-class SignupFrame(ctk.CTkFrame):
+class SignupFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
 
@@ -177,7 +252,12 @@ class SignupFrame(ctk.CTkFrame):
         
         self.feedback_label.pack(pady=(10, 0))
 
-class LoginFrame(ctk.CTkFrame):
+    def on_show(self):
+        for entry in (self.username_entry, self.password_entry, self.confirm_password_entry):
+            clear_entry(entry)
+        self.feedback_label.configure(text="")
+
+class LoginFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
 
@@ -260,9 +340,13 @@ class LoginFrame(ctk.CTkFrame):
 
         
         self.feedback_label.pack(pady=(10, 0))
-        return
 
-class WelcomeFrame(ctk.CTkFrame):
+    def on_show(self):
+        for entry in (self.username_entry, self.password_entry):
+            clear_entry(entry)
+        self.feedback_label.configure(text="")
+
+class WelcomeFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
         self.account_menu = None
@@ -270,32 +354,26 @@ class WelcomeFrame(ctk.CTkFrame):
         top_bar.pack(fill="x", pady=(0, 20))
         top_bar.pack_propagate(False)
         
-        ctk.CTkLabel(
+        self.welcome_label = ctk.CTkLabel(
             top_bar,
-            text=f"Welcome, {parent.current_user}!",
+            text="",
             text_color="white",
             font=("Arial", 24, "bold")
-        ).pack(side="left", padx=20)
+        )
+        self.welcome_label.pack(side="left", padx=20)
 
-        stats_container = ctk.CTkFrame(self, fg_color="#1a237e", corner_radius=10)
-        stats_container.pack(pady=10, padx=20, fill="x")
+        self.stats_container = ctk.CTkFrame(self, fg_color="#1a237e", corner_radius=10)
+        self.stats_container.pack(pady=10, padx=20, fill="x")
 
-        stats = se.calculate_user_stats(parent.current_user)
-        
         ctk.CTkLabel(
-            stats_container,
+            self.stats_container,
             text="Your Statistics",
             text_color="white",
             font=("Arial", 18, "bold")
         ).pack(pady=(10, 5))
 
-        for stat, value in stats.items():
-            ctk.CTkLabel(
-                stats_container,
-                text=f"{stat}: {value}",
-                text_color="white",
-                font=("Arial", 14)
-            ).pack(pady=2)
+        # One label per statistic, reused from one user to the next
+        self.stat_labels = []
 
         button_container = ctk.CTkFrame(self, fg_color="transparent")
         button_container.pack(side="bottom", pady=20)
@@ -332,6 +410,24 @@ class WelcomeFrame(ctk.CTkFrame):
             command=lambda: self.confirm_delete_account()
         ).pack(side="left", padx=10)
 
+    def on_show(self):
+        parent = self.master
+        self.welcome_label.configure(text=f"Welcome, {parent.current_user}!")
+
+        stats = se.calculate_user_stats(parent.users, parent.current_user)
+        for i, (stat, value) in enumerate(stats.items()):
+            if i == len(self.stat_labels):
+                self.stat_labels.append(ctk.CTkLabel(
+                    self.stats_container,
+                    text="",
+                    text_color="white",
+                    font=("Arial", 14)
+                ))
+            self.stat_labels[i].configure(text=f"{stat}: {value}")
+            self.stat_labels[i].pack(pady=2)
+        for label in self.stat_labels[len(stats):]:
+            label.pack_forget()
+
     def confirm_delete_account(self):
         dialog = ctk.CTkToplevel(self)
         dialog.title("Delete Account")
@@ -368,13 +464,14 @@ class WelcomeFrame(ctk.CTkFrame):
         button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
         button_frame.pack(pady=20)
 
-        ctk.CTkButton(
+        delete_button = ctk.CTkButton(
             button_frame,
             text="Delete Account",
             fg_color="#f44336",
             hover_color="#d32f2f",
-            command=lambda: um.validate_and_delete(dialog, password_entry, confirm_entry, feedback_label, self.master)
-        ).pack(side="left", padx=10)
+            command=lambda: um.validate_and_delete(dialog, password_entry, confirm_entry, feedback_label, self.master, delete_button)
+        )
+        delete_button.pack(side="left", padx=10)
 
         ctk.CTkButton(
             button_frame,
@@ -385,7 +482,7 @@ class WelcomeFrame(ctk.CTkFrame):
         ).pack(side="left", padx=10)
         
 
-class CategoryFrame(ctk.CTkFrame):
+class CategoryFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
         
@@ -401,7 +498,7 @@ class CategoryFrame(ctk.CTkFrame):
         title.pack(pady=(50, 20))
 
         self.category_vars = {}
-        categories = list(parent.all_questions.keys())
+        categories = parent.question_bank.categories()
 
         # Create a frame for checkboxes with fixed width
         checkbox_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -430,8 +527,18 @@ class CategoryFrame(ctk.CTkFrame):
             # Center the checkbox in its container
             checkbox.pack(expand=True)
 
+        # Kept between quizzes: questions due for review and unseen ones first
+        self.adaptive_var = ctk.BooleanVar(value=parent.adaptive)
+        ctk.CTkSwitch(
+            self,
+            text="Adaptive: review missed questions first",
+            variable=self.adaptive_var,
+            text_color="white",
+            font=("Arial", 14)
+        ).pack()
+
         btn_frame = ctk.CTkFrame(self, fg_color="transparent")
-        btn_frame.pack(pady=80)
+        btn_frame.pack(pady=(50, 80))
 
         ctk.CTkButton(
             btn_frame,
@@ -449,6 +556,10 @@ class CategoryFrame(ctk.CTkFrame):
             command=lambda: parent.show_frame("welcome")
         ).pack(side="left", padx=20)
 
+    def on_show(self):
+        for var in self.category_vars.values():
+            var.set(False)
+
     def start_quiz(self, parent):
         selected = [cat for cat, var in self.category_vars.items() if var.get()]
         if not selected:
@@ -463,10 +574,12 @@ class CategoryFrame(ctk.CTkFrame):
             return
 
         self.master.selected_categories = selected
+        parent.adaptive = self.adaptive_var.get()
         qm.prepare_quiz(parent)
+        parent.stop_exam_timer()
         self.master.show_frame("quiz")
 
-class QuizFrame(ctk.CTkFrame):
+class QuizFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
         self.configure(width=600, height=400)
@@ -474,63 +587,54 @@ class QuizFrame(ctk.CTkFrame):
 
         self.parent = parent
         self.answer_var = ctk.StringVar()
-        self.initialTime = 30  # change this variable instead of changing all other variables
-        self.remaining_time = self.initialTime  # 30 seconds for the timer
+        self.timer_id = None  # countdown of the current question on parent.timers
+        self.shown_at = time.monotonic()  # to record how long the answer took
 
-        if not parent.questions:
-            ctk.CTkLabel(self, text="No questions available", text_color="yellow", font=("Arial", 18)).pack(pady=50)
-            return
+        self.empty_label = ctk.CTkLabel(self, text="No questions available", text_color="yellow", font=("Arial", 18))
+
+        # Everything but the empty label, so it can be hidden as a whole
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
 
         # Progress bar
-        progress_frame = ctk.CTkFrame(self, fg_color="#2196f3", height=40)
+        progress_frame = ctk.CTkFrame(self.body, fg_color="#2196f3", height=40)
         progress_frame.pack(fill="x")
         progress_frame.pack_propagate(False)
 
-        progress_text = f"Question {parent.current_question + 1} of {len(parent.questions)}"
-        progress_label = ctk.CTkLabel(progress_frame, text=progress_text, text_color="white", font=("Arial", 16, "bold"))
-        progress_label.pack(side="left", padx=10)
+        self.progress_label = ctk.CTkLabel(progress_frame, text="", text_color="white", font=("Arial", 16, "bold"))
+        self.progress_label.pack(side="left", padx=10)
 
         # Timer label
-        self.timer_label = ctk.CTkLabel(progress_frame, text=f"Time: {self.initialTime}", text_color="white", font=("Arial", 16, "bold"))
+        self.timer_label = ctk.CTkLabel(progress_frame, text="", text_color="white", font=("Arial", 16, "bold"))
         self.timer_label.pack(side="right", padx=10)
-        self.start_timer()
+
+        # Time left for the whole quiz, when it is limited
+        self.exam_label = ctk.CTkLabel(progress_frame, text="", text_color="white", font=("Arial", 16, "bold"))
+        self.exam_label.pack(side="right", padx=10)
 
         # Question container
-        question_container = ctk.CTkFrame(self, fg_color="transparent")
+        question_container = ctk.CTkFrame(self.body, fg_color="transparent")
         question_container.pack(expand=True, fill="both", padx=20, pady=(10, 20))
 
-        question = parent.questions[parent.current_question]
-
         # Question title - centered
-        title = ctk.CTkLabel(
+        self.title_label = ctk.CTkLabel(
             question_container,
-            text=question["question"],
+            text="",
             text_color="white",
             font=("Arial", 18, "bold"),
             wraplength=500,
             justify="center"
         )
-        title.pack(expand=True, anchor="center", pady=(0, 20))
+        self.title_label.pack(expand=True, anchor="center", pady=(0, 20))
 
         # Options container - centered
-        options_container = ctk.CTkFrame(question_container, fg_color="transparent")
-        options_container.pack(expand=True, anchor="center", pady=(0, 20))
-
-        for i, option in enumerate(question["options"], 1):
-            option_btn = ctk.CTkRadioButton(
-                options_container,
-                text=option,
-                variable=self.answer_var,
-                value=str(i),
-                text_color="white",
-                font=("Arial", 16),
-                hover_color="#4a5fc1",
-                fg_color="#2196f3"
-            )
-            option_btn.pack(pady=10, anchor="w")
+        self.options_container = ctk.CTkFrame(question_container, fg_color="transparent")
+        self.options_container.pack(expand=True, anchor="center", pady=(0, 20))
+
+        # Radio buttons, created as needed and reused for every question
+        self.option_buttons = []
 
         # Button frame
-        button_frame = ctk.CTkFrame(self, fg_color="transparent", height=80)
+        button_frame = ctk.CTkFrame(self.body, fg_color="transparent", height=80)
         button_frame.pack(fill="x", side="bottom")
         button_frame.pack_propagate(False)
 
@@ -553,7 +657,7 @@ class QuizFrame(ctk.CTkFrame):
         quit_btn = ctk.CTkButton(
             button_container,
             text="Quit Quiz",
-            command=lambda: parent.show_frame("welcome"),
+            command=self.quit_quiz,
             fg_color="#f44336",
             hover_color="#d32f2f",
             font=("Arial", 14, "bold"),
@@ -563,57 +667,97 @@ class QuizFrame(ctk.CTkFrame):
         )
         quit_btn.pack(side="left", padx=10)
 
-    def start_timer(self):
-        """Starts the 30-second timer."""
-        if self.remaining_time > 0:
-            self.timer_label.configure(text=f"Time: {self.remaining_time}s")
-            self.remaining_time -= 1
-            self.after(1000, self.start_timer)  # Update timer every second
+    def on_show(self):
+        """Display the current question and start its countdown (and the quiz countdown on the first question)."""
+        parent = self.parent
+        quiz = parent.quiz
+        if quiz.finished:
+            self.body.pack_forget()
+            self.empty_label.pack(pady=50)
+            return
+        self.empty_label.pack_forget()
+        self.body.pack(fill="both", expand=True)
+
+        question = quiz.question
+        self.progress_label.configure(text=f"Question {quiz.current + 1} of {len(quiz.questions)}")
+        self.title_label.configure(text=question.text)
+
+        self.answer_var.set("")
+        options = question.options
+        for i, option in enumerate(options):
+            if i == len(self.option_buttons):
+                self.option_buttons.append(ctk.CTkRadioButton(
+                    self.options_container,
+                    text="",
+                    variable=self.answer_var,
+                    value=str(i),
+                    text_color="white",
+                    font=("Arial", 16),
+                    hover_color="#4a5fc1",
+                    fg_color="#2196f3"
+                ))
+            self.option_buttons[i].configure(text=option)
+            self.option_buttons[i].pack(pady=10, anchor="w")
+        for option_btn in self.option_buttons[len(options):]:
+            option_btn.pack_forget()
+
+        self.shown_at = time.monotonic()
+
+        exam_time = parent.settings["exam_time"]
+        if exam_time > 0 and parent.exam_timer is None and not quiz.answers:
+            parent.exam_timer = parent.timers.start(exam_time, self.show_exam_time, self.exam_time_up)
+        elif exam_time <= 0:
+            self.exam_label.configure(text="")
+
+        question_time = parent.settings["question_time"]
+        if question_time > 0:
+            self.timer_id = parent.timers.start(question_time, self.show_time, self.time_up)
         else:
-            self.time_up()
+            self.timer_label.configure(text="")
+
+    def on_hide(self):
+        self.parent.timers.cancel(self.timer_id)
+        self.timer_id = None
+
+    def show_time(self, seconds):
+        self.timer_label.configure(text=f"Time: {seconds}s")
+
+    def show_exam_time(self, seconds):
+        self.exam_label.configure(text=f"Quiz: {seconds // 60}:{seconds % 60:02d}")
 
     def time_up(self):
         """Handles what happens when time is up."""
+        self.timer_id = None
         self.show_error("Time's up! Moving to the next question.")
         parent = self.parent
-        question = parent.questions[parent.current_question]
-
-        for i, (cat, current_score, num_questions) in enumerate(parent.score):
-            if cat == question["category"]:
-                parent.score[i] = (cat, current_score, num_questions + 1)
-                break
+        parent.quiz.time_out(time.monotonic() - self.shown_at)
         parent.show_frame("wrong")
 
+    def exam_time_up(self):
+        """End the quiz when its time limit is reached; the questions not answered yet count as timed out."""
+        parent = self.parent
+        parent.exam_timer = None
+        parent.quiz.time_out_remaining(time.monotonic() - self.shown_at)
+        self.show_error("Time's up! The quiz is over.")
+        parent.show_frame("score")
+
+    def quit_quiz(self):
+        self.parent.stop_exam_timer()
+        self.parent.show_frame("welcome")
+
     def check_answer(self):
         if not self.answer_var.get():
             self.show_error("Please select an answer")
             return
 
-        parent = self.parent
-        question = parent.questions[parent.current_question]
-
-        for i, (cat, current_score, num_questions) in enumerate(parent.score):
-            if cat == question["category"]:
-                parent.score[i] = (cat, current_score, num_questions + 1)
-                break
-
-        if self.answer_var.get() == question["correct"]:
-            for i, (cat, current_score, num_questions) in enumerate(parent.score):
-                if cat == question["category"]:
-                    parent.score[i] = (cat, current_score + 1, num_questions)
-                    break
+        choice = int(self.answer_var.get())
+        if self.parent.quiz.answer(choice, time.monotonic() - self.shown_at):
             self.next_question()
         else:
-            parent.show_frame("wrong")
+            self.parent.show_frame("wrong")
 
     def next_question(self):
-        self.remaining_time = self.initialTime  # Reset timer for the next question
-        parent = self.parent
-        parent.current_question += 1
-        if parent.current_question >= len(parent.questions):
-            parent.show_frame("score")
-        else:
-            parent.show_frame("quiz")
+        self.parent.show_frame("quiz" if self.parent.quiz.advance() else "score")
 
     def show_error(self, message):
         error_window = ctk.CTkToplevel(self)
@@ -624,7 +768,7 @@ class QuizFrame(ctk.CTkFrame):
         ctk.CTkLabel(error_window, text=message, font=("Arial", 14), text_color="white").pack(pady=20)
         ctk.CTkButton(error_window, text="OK", command=error_window.destroy, width=100).pack(pady=10)
 
-class WrongFrame(ctk.CTkFrame):
+class WrongFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
 
@@ -642,15 +786,13 @@ class WrongFrame(ctk.CTkFrame):
             font=("Arial", 16)
         ).pack(pady=5)
 
-        question = parent.questions[parent.current_question]
-        correct_answer = question["options"][int(question["correct"]) - 1]
-
-        ctk.CTkLabel(
+        self.answer_label = ctk.CTkLabel(
             self,
-            text=correct_answer,
+            text="",
             text_color="#4CAF50",
             font=("Arial", 18, "bold")
-        ).pack(pady=10)
+        )
+        self.answer_label.pack(pady=10)
 
         ctk.CTkButton(
             self,
@@ -660,14 +802,153 @@ class WrongFrame(ctk.CTkFrame):
             command=self.next_question
         ).pack(pady=40)
 
+    def on_show(self):
+        question = self.master.quiz.question
+        self.answer_label.configure(text=question.options[question.correct])
+
     def next_question(self):
-        self.master.current_question += 1
-        if self.master.current_question >= len(self.master.questions):
-            self.master.show_frame("score")
+        self.master.show_frame("quiz" if self.master.quiz.advance() else "score")
+
+class HistoryList(ctk.CTkFrame):
+    """
+    Virtualized list of history entries, newest first.
+    Only VISIBLE_ROWS row widgets are built; scrolling refills them with other entries,
+    which are fetched from the user repository one page at a time. show() points the
+    list at the history of a user, so the same widgets serve every user.
+    """
+    VISIBLE_ROWS = 4
+    ROW_HEIGHT = 85
+    PAGE_SIZE = 20
+    CACHED_PAGES = 8
+
+    def __init__(self, parent, users):
+        super().__init__(parent, fg_color="transparent")
+        self.users = users
+        self.username = None
+        self.count = 0
+        self.visible = 0
+        self.top = 0
+        self.pages = OrderedDict()
+
+        rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        rows_frame.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.rows = [self.create_row(rows_frame) for _ in range(self.VISIBLE_ROWS)]
+
+        # Mouse wheel scrolling while the pointer is over the list
+        self.bind("<Enter>", lambda e: self.bind_wheel(True))
+        self.bind("<Leave>", lambda e: self.bind_wheel(False))
+        self.bind("<Destroy>", lambda e: self.bind_wheel(False) if e.widget is self else None)
+
+    def show(self, username, count):
+        """Display the history of a user, who has count entries, from the newest entry."""
+        self.username = username
+        self.count = count
+        self.visible = min(self.VISIBLE_ROWS, count)
+        self.top = 0
+        self.pages.clear()
+        for i, (entry_frame, _, _, _) in enumerate(self.rows):
+            if i < self.visible:
+                entry_frame.pack(pady=5, padx=10, fill="x")
+            else:
+                entry_frame.pack_forget()
+        self.render()
+
+    def create_row(self, container):
+        entry_frame = ctk.CTkFrame(
+            container,
+            fg_color="#1a237e",
+            corner_radius=10,
+            height=self.ROW_HEIGHT
+        )
+        entry_frame.pack_propagate(False)
+
+        # Date
+        date_label = ctk.CTkLabel(
+            entry_frame,
+            text="",
+            text_color="white",
+            font=("Arial", 14)
+        )
+        date_label.pack(pady=(5, 0), padx=10, anchor="w")
+
+        # Total Score
+        total_label = ctk.CTkLabel(
+            entry_frame,
+            text="",
+            text_color="#4CAF50",
+            font=("Arial", 14, "bold")
+        )
+        total_label.pack(pady=0, padx=10, anchor="w")
+
+        # Categories with individual scores
+        categories_label = ctk.CTkLabel(
+            entry_frame,
+            text="",
+            text_color="white",
+            font=("Arial", 12),
+            justify="left",
+            wraplength=480
+        )
+        categories_label.pack(pady=(0, 5), padx=10, anchor="w")
+
+        return entry_frame, date_label, total_label, categories_label
+
+    def entry(self, index):
+        """Return the index-th newest entry, loading its page if needed."""
+        page = index // self.PAGE_SIZE
+        if page in self.pages:
+            self.pages.move_to_end(page)
+        else:
+            self.pages[page] = self.users.get_history_page(self.username, page * self.PAGE_SIZE, self.PAGE_SIZE)
+            if len(self.pages) > self.CACHED_PAGES:
+                self.pages.popitem(last=False)
+        entries = self.pages[page]
+        offset = index % self.PAGE_SIZE
+        return entries[offset] if offset < len(entries) else None
+
+    def render(self):
+        for i, (_, date_label, total_label, categories_label) in enumerate(self.rows[:self.visible]):
+            entry = self.entry(self.top + i)
+            if entry is None:
+                continue
+            date_label.configure(text=f"Date: {entry['date']}")
+            total_label.configure(text=f"Total Score: {entry['correct']}/{entry['total']}")
+            categories_label.configure(text="Category Scores: " + "   ".join(
+                f"{cat['category']}: {cat['correct']}/{cat['total']}" for cat in entry['categories']
+            ))
+        self.scrollbar.set(self.top / self.count, min(1.0, (self.top + self.VISIBLE_ROWS) / self.count))
+
+    def scroll_to(self, top):
+        top = max(0, min(top, self.count - self.visible))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(value) * self.count))
+        elif action == "scroll":
+            step = self.VISIBLE_ROWS if unit == "pages" else 1
+            self.scroll_to(self.top + int(value) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 1)
         else:
-            self.master.show_frame("quiz")
+            self.scroll_to(self.top + 1)
+
+    def bind_wheel(self, active):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            if active:
+                self.bind_all(sequence, self.on_wheel)
+            else:
+                self.unbind_all(sequence)
 
-class HistoryFrame(ctk.CTkFrame):
+class HistoryFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
 
@@ -685,109 +966,59 @@ class HistoryFrame(ctk.CTkFrame):
             command=lambda: parent.show_frame("welcome")
         ).pack(side="left", padx=(10, 0))
 
-        ctk.CTkLabel(
+        self.title_label = ctk.CTkLabel(
             top_nav_frame,
-            text=f"Quiz History for {parent.current_user}",
+            text="",
             text_color="white",
             font=("Arial", 24, "bold")
-        ).pack(side="left", expand=True)
-
-        
+        )
+        self.title_label.pack(side="left", expand=True)
 
-        # Create scrollable frame for history entries
-        history_container = ctk.CTkScrollableFrame(
-            self,
-            width=500,
-            height=400,
-            fg_color="transparent"
+        self.export_button = ctk.CTkButton(
+            top_nav_frame,
+            text="Export to CSV",
+            fg_color="#DDB700",
+            hover_color="#FFC107",
+            font=("Arial", 14),
+            width=100,
+            command=lambda: self.handle_export(parent.current_user)
         )
-        history_container.pack(pady=20, padx=20, fill="both", expand=True)
+
+        # "No quiz history" or error message, in place of the list
+        self.message_label = ctk.CTkLabel(self, text="", font=("Arial", 16))
+
+        # Only the visible entries get widgets, refilled while scrolling
+        self.history_list = HistoryList(self, parent.users)
+
+        # Add buttons at the bottom
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.pack(pady=(20, 10), padx=20, fill="x", side="bottom")
+
+    def on_show(self):
+        parent = self.master
+        self.title_label.configure(text=f"Quiz History for {parent.current_user}")
+        for widget in (self.export_button, self.message_label, self.history_list):
+            widget.pack_forget()
 
         # Load and display history
         try:
-            with open('data/users.json', 'r') as f:
-                users = json.load(f)
-                user_data = users.get(parent.current_user, {})
-                history = user_data.get('history', [])
-
-                if not history:
-                    ctk.CTkLabel(
-                        history_container,
-                        text="No quiz history available",
-                        text_color="yellow",
-                        font=("Arial", 16)
-                    ).pack(pady=20)
-                else:
-                    ctk.CTkButton(
-                        top_nav_frame,
-                        text="Export to CSV",
-                        fg_color="#DDB700",
-                        hover_color="#FFC107",
-                        font=("Arial", 14),
-                        width=100,
-                        command=lambda: self.handle_export(parent.current_user)
-                    ).pack(side="right", padx=(0, 10))
-                    # Display each history entry
-                    for entry in reversed(history):
-                        entry_frame = ctk.CTkFrame(
-                            history_container,
-                            fg_color="#1a237e",
-                            corner_radius=10
-                        )
-                        entry_frame.pack(pady=5, padx=10, fill="x")
-
-                        # Date
-                        ctk.CTkLabel(
-                            entry_frame,
-                            text=f"Date: {entry['date']}",
-                            text_color="white",
-                            font=("Arial", 14)
-                        ).pack(pady=(5, 0), padx=10, anchor="w")
-
-                        # Total Score
-                        ctk.CTkLabel(
-                            entry_frame,
-                            text=f"Total Score: {entry['total_score']}",
-                            text_color="#4CAF50",
-                            font=("Arial", 14, "bold")
-                        ).pack(pady=(0, 5), padx=10, anchor="w")
-
-                        # Categories with individual scores
-                        if 'categories' in entry:
-                            categories_frame = ctk.CTkFrame(
-                                entry_frame,
-                                fg_color="transparent"
-                            )
-                            categories_frame.pack(pady=(0, 5), padx=10, fill="x")
-
-                            ctk.CTkLabel(
-                                categories_frame,
-                                text="Category Scores:",
-                                text_color="white",
-                                font=("Arial", 12, "bold")
-                            ).pack(anchor="w")
-
-                            for category_entry in entry['categories']:
-                                category_text = f"{category_entry['category']}: {category_entry['score']}"
-                                ctk.CTkLabel(
-                                    categories_frame,
-                                    text=category_text,
-                                    text_color="white",
-                                    font=("Arial", 12)
-                                ).pack(pady=(0, 2), anchor="w")
+            count = parent.users.get_stats(parent.current_user)["quizzes"]
+
+            if not count:
+                self.message_label.configure(text="No quiz history available", text_color="yellow")
+                self.message_label.pack(pady=20)
+            else:
+                self.export_button.pack(side="right", padx=(0, 10))
+                self.history_list.show(parent.current_user, count)
+                self.history_list.pack(pady=20, padx=20, fill="both", expand=True)
 
         except Exception as e:
-            ctk.CTkLabel(
-                history_container,
-                text="Error loading history",
-                text_color="red",
-                font=("Arial", 16)
-            ).pack(pady=20)
+            self.message_label.configure(text="Error loading history", text_color="red")
+            self.message_label.pack(pady=20)
             print(f"Error loading history: {e}")
 
-        # Add buttons at the bottom
-        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
-        btn_frame.pack(pady=(20, 10), padx=20, fill="x", side="bottom")
+    def on_hide(self):
+        self.history_list.bind_wheel(False)
 
     def handle_export(self, username):
         """Handle the export process including file dialog"""
@@ -796,6 +1027,7 @@ class HistoryFrame(ctk.CTkFrame):
             default_filename = f"{username}_{datetime.now().strftime('%Y-%m-%d-%H-%M')}.csv"
             
             # Open file dialog to select save location)
+            from customtkinter import filedialog
             file_path = filedialog.asksaveasfilename(
                 parent=self,
                 defaultextension='.csv',
@@ -805,7 +1037,7 @@ class HistoryFrame(ctk.CTkFrame):
             )
             
             if file_path:  # Only proceed if a file path was selected
-                um.export_csv(username, file_path)
+                um.export_csv(self.master.users, username, file_path)
         except Exception as e:
             self.show_message("Error", f"Failed to export: {str(e)}", "#f44336")
 
@@ -835,12 +1067,10 @@ class HistoryFrame(ctk.CTkFrame):
             hover_color="#1976D2"
         ).pack(pady=10)
 
-class ScoreFrame(ctk.CTkFrame):
+class ScoreFrame(AppFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="#3f51b5")
 
-        # Calculate percentage score
-        percentage = se.calculate_percentage(parent.score)
         # Display score
         ctk.CTkLabel(
             self,
@@ -849,24 +1079,22 @@ class ScoreFrame(ctk.CTkFrame):
             font=("Arial", 24, "bold")
         ).pack(pady=(50, 20))
 
-        ctk.CTkLabel(
+        self.percentage_label = ctk.CTkLabel(
             self,
-            text=f"Percentage: {percentage:.1f}%",
+            text="",
             text_color="white",
             font=("Arial", 20)
-        ).pack(pady=10)
+        )
+        self.percentage_label.pack(pady=10)
 
-        # Display performance message based on score
-        performance_text = se.evaluate_performance(percentage)
-        ctk.CTkLabel(
+        # Performance message based on score
+        self.performance_label = ctk.CTkLabel(
             self,
-            text=performance_text,
+            text="",
             text_color="#4CAF50",
             font=("Arial", 18)
-        ).pack(pady=20)
-
-        # Save score to user history
-        um.save_score(parent)
+        )
+        self.performance_label.pack(pady=20)
 
         # Buttons frame
         btn_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -894,4 +1122,16 @@ class ScoreFrame(ctk.CTkFrame):
             fg_color="red",
             font=("Arial", 14),
             command=lambda: parent.show_frame("login")
-        ).pack(side="left", padx=10)
\ No newline at end of file
+        ).pack(side="left", padx=10)
+
+    def on_show(self):
+        parent = self.master
+        parent.stop_exam_timer()
+
+        # Calculate percentage score
+        percentage = se.calculate_percentage(parent.quiz.score)
+        self.percentage_label.configure(text=f"Percentage: {percentage:.1f}%")
+        self.performance_label.configure(text=se.evaluate_performance(percentage))
+
+        # Save score to user history
+        um.save_score(parent)
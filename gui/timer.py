@@ -0,0 +1,78 @@
+import itertools
+import math
+import time
+
+class Countdown:
+    __slots__ = ("deadline", "on_tick", "on_expire", "shown")
+
+    def __init__(self, deadline, on_tick, on_expire):
+        self.deadline = deadline
+        self.on_tick = on_tick
+        self.on_expire = on_expire
+        self.shown = None  # whole seconds last passed to on_tick
+
+class TimerScheduler:
+    """
+    Countdowns of the app, all driven by a single Tk after() tick.
+    Each countdown has a deadline on the monotonic clock, so callback latency never adds up,
+    and stays active until it expires or its owner cancels it. The tick is only scheduled while
+    a countdown is running, for the moment the next displayed second changes or a deadline passes.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.countdowns = {}
+        self.ids = itertools.count(1)
+        self.after_id = None
+
+    def start(self, seconds, on_tick=None, on_expire=None):
+        """
+        Start a countdown and return its id. on_tick(seconds_left) is called right away and then
+        each time the whole number of seconds left changes; on_expire() is called once at the deadline.
+        """
+        timer_id = next(self.ids)
+        self.countdowns[timer_id] = Countdown(time.monotonic() + seconds, on_tick, on_expire)
+        self.tick()
+        return timer_id
+
+    def remaining(self, timer_id):
+        """Return the seconds left on a countdown, or 0 if it is not running."""
+        countdown = self.countdowns.get(timer_id)
+        return max(0.0, countdown.deadline - time.monotonic()) if countdown else 0.0
+
+    def cancel(self, timer_id):
+        """Stop a countdown without calling on_expire. Unknown ids (or None) are ignored."""
+        self.countdowns.pop(timer_id, None)
+        if not self.countdowns and self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def cancel_all(self):
+        for timer_id in list(self.countdowns):
+            self.cancel(timer_id)
+
+    def tick(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+        now = time.monotonic()
+        for timer_id, countdown in list(self.countdowns.items()):
+            if timer_id not in self.countdowns:
+                continue  # cancelled by an earlier callback of this tick
+            left = countdown.deadline - now
+            if left <= 0:
+                del self.countdowns[timer_id]
+                if countdown.on_expire:
+                    countdown.on_expire()
+            elif countdown.on_tick and math.ceil(left) != countdown.shown:
+                countdown.shown = math.ceil(left)
+                countdown.on_tick(countdown.shown)
+
+        if self.countdowns and self.after_id is None:
+            now = time.monotonic()
+            # Wake up when the first countdown reaches its next whole second (or its deadline)
+            delay = min(
+                (countdown.deadline - now) - (math.ceil(countdown.deadline - now) - 1)
+                for countdown in self.countdowns.values()
+            )
+            self.after_id = self.root.after(max(1, math.ceil(delay * 1000)), self.tick)